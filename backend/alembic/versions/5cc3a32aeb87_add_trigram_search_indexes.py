@@ -0,0 +1,59 @@
+"""add_trigram_search_indexes
+
+Revision ID: 5cc3a32aeb87
+Revises: 45f3fd1736ff
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5cc3a32aeb87'
+down_revision: Union[str, None] = '45f3fd1736ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Colonnes interrogées en « contient » (ILIKE '%x%') et classées par similarité
+TRIGRAM_COLUMNS = {
+    'contacts': ['name', 'email', 'siret', 'city'],
+    'categories': ['name', 'code', 'description'],
+    'users': ['first_name', 'last_name', 'email'],
+}
+
+
+def upgrade() -> None:
+    """
+    Index GIN pg_trgm pour les recherches « contient ».
+    Les index B-tree existants ne servent pas ILIKE '%x%' ;
+    les index trigrammes, si (et servent aussi word_similarity).
+    Construction CONCURRENTLY : pas de verrou d'écriture sur les tables.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for table, columns in TRIGRAM_COLUMNS.items():
+            for column in columns:
+                op.create_index(
+                    f'ix_{table}_{column}_trgm',
+                    table,
+                    [column],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True
+                )
+
+
+def downgrade() -> None:
+    """
+    Supprimer les index trigrammes.
+    L'extension pg_trgm est conservée (elle peut servir ailleurs).
+    """
+    with op.get_context().autocommit_block():
+        for table, columns in TRIGRAM_COLUMNS.items():
+            for column in columns:
+                op.drop_index(f'ix_{table}_{column}_trgm', table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""add_cache_versions_table
+
+Revision ID: 9b1f4e2c7a63
+Revises: 5cc3a32aeb87
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f4e2c7a63'
+down_revision: Union[str, None] = '5cc3a32aeb87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Table des versions des caches mémoire (app/cache.py).
+    Chaque modification des catégories incrémente leur version :
+    les autres workers rechargent leur cache au prochain contrôle.
+    """
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO cache_versions (name, version) VALUES ('categories', 0)")
+
+
+def downgrade() -> None:
+    """
+    Supprimer la table des versions de cache.
+    """
+    op.drop_table('cache_versions')
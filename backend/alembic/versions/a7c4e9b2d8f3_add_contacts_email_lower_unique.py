@@ -0,0 +1,50 @@
+"""add_contacts_email_lower_unique
+
+Revision ID: a7c4e9b2d8f3
+Revises: f6b8d2a4c9e7
+Create Date: 2026-10-19 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e9b2d8f3'
+down_revision: Union[str, None] = 'f6b8d2a4c9e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Unicité de l'email des contacts sans tenir compte de la casse :
+    cible ON CONFLICT (lower(email)) de POST /api/contacts/upsert.
+    Les emails en double à la casse près doivent être fusionnés avant
+    (voir GET /api/contacts/duplicates, raison same_email).
+    Construction CONCURRENTLY : pas de verrou d'écriture sur contacts.
+    """
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(email) FROM contacts WHERE email IS NOT NULL "
+        "GROUP BY lower(email) HAVING count(*) > 1 LIMIT 10"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Contacts share an email up to case, merge them first: " + ", ".join(duplicates)
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_email_lower',
+            'contacts',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_contacts_email_lower', table_name='contacts', postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""drop_expenses_pending_partial_index
+
+Revision ID: b8d5f1a3e6c9
+Revises: a7c4e9b2d8f3
+Create Date: 2026-10-19 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d5f1a3e6c9'
+down_revision: Union[str, None] = 'a7c4e9b2d8f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Supprimer l'index partiel des dépenses à valider (status = 'PENDING').
+    L'API envoie le statut en paramètre (status = $1) : une fois le plan
+    générique adopté, PostgreSQL ne peut plus prouver $1 = 'PENDING' et
+    ignore l'index partiel. L'index (status, expense_date, id) sert ce
+    filtre quel que soit le plan.
+    Table partitionnée : pas de DROP INDEX CONCURRENTLY possible, la
+    suppression prend un verrou bref sur expenses.
+    """
+    op.drop_index('ix_expenses_pending_expense_date', table_name='expenses')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_expenses_pending_expense_date',
+        'expenses',
+        ['expense_date', 'id'],
+        unique=False,
+        postgresql_include=['updated_at'],
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
@@ -0,0 +1,71 @@
+"""add_expense_composite_indexes
+
+Revision ID: c3e8a1f5d2b7
+Revises: 9b1f4e2c7a63
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a1f5d2b7'
+down_revision: Union[str, None] = '9b1f4e2c7a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index composites -> index mono-colonne qu'ils remplacent (même préfixe)
+COMPOSITE_INDEXES = {
+    'ix_expenses_expense_date_id': (['expense_date', 'id'], 'ix_expenses_expense_date', 'expense_date'),
+    'ix_expenses_status_expense_date': (['status', 'expense_date', 'id'], 'ix_expenses_status', 'status'),
+    'ix_expenses_user_id_expense_date': (['user_id', 'expense_date', 'id'], 'ix_expenses_user_id', 'user_id'),
+    'ix_expenses_category_id_expense_date': (['category_id', 'expense_date', 'id'], 'ix_expenses_category_id', 'category_id'),
+}
+
+
+def upgrade() -> None:
+    """
+    Index composites calqués sur GET /api/expenses : filtre d'égalité
+    puis tri (expense_date desc, id desc), curseur compris.
+    INCLUDE (updated_at) : l'agrégat de l'ETag (max(updated_at), count)
+    devient un parcours d'index seul, sans lire la table.
+    Les index mono-colonne remplacés sont supprimés (préfixes redondants).
+    Construction CONCURRENTLY : pas de verrou d'écriture sur expenses.
+    """
+    with op.get_context().autocommit_block():
+        for name, (columns, _, _) in COMPOSITE_INDEXES.items():
+            op.create_index(
+                name,
+                'expenses',
+                columns,
+                unique=False,
+                postgresql_include=['updated_at'],
+                postgresql_concurrently=True
+            )
+        # Dépenses à valider : petit index partiel, toujours en cache
+        op.create_index(
+            'ix_expenses_pending_expense_date',
+            'expenses',
+            ['expense_date', 'id'],
+            unique=False,
+            postgresql_include=['updated_at'],
+            postgresql_where=sa.text("status = 'PENDING'"),
+            postgresql_concurrently=True
+        )
+        for _, replaced, _ in COMPOSITE_INDEXES.values():
+            op.drop_index(replaced, table_name='expenses', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """
+    Recréer les index mono-colonne, puis supprimer les index composites.
+    """
+    with op.get_context().autocommit_block():
+        for _, replaced, column in COMPOSITE_INDEXES.values():
+            op.create_index(replaced, 'expenses', [column], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_expenses_pending_expense_date', table_name='expenses', postgresql_concurrently=True)
+        for name in COMPOSITE_INDEXES:
+            op.drop_index(name, table_name='expenses', postgresql_concurrently=True)
@@ -0,0 +1,166 @@
+"""partition_expenses_by_year
+
+Revision ID: d4f7b2e9a1c6
+Revises: c3e8a1f5d2b7
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f7b2e9a1c6'
+down_revision: Union[str, None] = 'c3e8a1f5d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, amount, description, expense_date, status, user_id, category_id, contact_id, created_at, updated_at"
+
+COLUMN_DEFINITIONS = """
+    id integer NOT NULL DEFAULT nextval('expenses_id_seq'),
+    amount numeric(10, 2) NOT NULL,
+    description text NOT NULL,
+    expense_date date NOT NULL,
+    status expensestatus NOT NULL,
+    user_id integer NOT NULL,
+    category_id integer NOT NULL,
+    contact_id integer,
+    created_at timestamp with time zone NOT NULL DEFAULT now(),
+    updated_at timestamp with time zone NOT NULL DEFAULT now()
+"""
+
+# Crée la partition d'un exercice (année civile) si elle n'existe pas.
+# Les lignes de cet exercice déjà tombées dans expenses_default y sont
+# déplacées avant l'attachement (sinon ATTACH échoue). Le verrou
+# consultatif sérialise les workers qui démarrent en même temps.
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_expense_partition(fiscal_year integer) RETURNS void AS $$
+DECLARE
+    partition_name text := format('expenses_%s', fiscal_year);
+    range_start date := make_date(fiscal_year, 1, 1);
+    range_end date := make_date(fiscal_year + 1, 1, 1);
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_expense_partition'));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE expenses INCLUDING DEFAULTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM expenses_default WHERE expense_date >= %L AND expense_date < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        range_start, range_end, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE expenses ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _create_keys_and_indexes(primary_key: list) -> None:
+    """Clé primaire, clés étrangères et index de expenses (cf. models/expense.py)"""
+    op.create_primary_key('expenses_pkey', 'expenses', primary_key)
+    op.create_foreign_key('expenses_user_id_fkey', 'expenses', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('expenses_category_id_fkey', 'expenses', 'categories', ['category_id'], ['id'])
+    op.create_foreign_key('expenses_contact_id_fkey', 'expenses', 'contacts', ['contact_id'], ['id'])
+    op.create_index('ix_expenses_id', 'expenses', ['id'], unique=False)
+    op.create_index('ix_expenses_contact_id', 'expenses', ['contact_id'], unique=False)
+    for name, columns in (
+        ('ix_expenses_expense_date_id', ['expense_date', 'id']),
+        ('ix_expenses_status_expense_date', ['status', 'expense_date', 'id']),
+        ('ix_expenses_user_id_expense_date', ['user_id', 'expense_date', 'id']),
+        ('ix_expenses_category_id_expense_date', ['category_id', 'expense_date', 'id']),
+    ):
+        op.create_index(name, 'expenses', columns, unique=False, postgresql_include=['updated_at'])
+    op.create_index(
+        'ix_expenses_pending_expense_date',
+        'expenses',
+        ['expense_date', 'id'],
+        unique=False,
+        postgresql_include=['updated_at'],
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def _replace_expenses_table(partitioned: bool) -> None:
+    """
+    Recopie expenses dans une nouvelle table (partitionnée ou non), puis
+    la met à sa place. Les clés et index sont créés après la copie (plus
+    rapide) et après la suppression de l'ancienne table (mêmes noms).
+    La séquence des id est conservée.
+    """
+    op.execute("ALTER SEQUENCE expenses_id_seq OWNED BY NONE")
+
+    if partitioned:
+        op.execute(f"CREATE TABLE expenses_new ({COLUMN_DEFINITIONS}) PARTITION BY RANGE (expense_date)")
+        op.execute("CREATE TABLE expenses_default PARTITION OF expenses_new DEFAULT")
+        # Une partition par exercice présent dans les données (dépenses
+        # historiques ou antidatées comprises), plus l'année en cours et la
+        # suivante : la copie ne laisse aucune ligne dans expenses_default
+        years = set(op.get_bind().scalars(
+            sa.text("SELECT DISTINCT extract(year FROM expense_date)::int FROM expenses")
+        ))
+        current_year = date.today().year
+        for year in sorted(years | {current_year, current_year + 1}):
+            op.execute(
+                f"CREATE TABLE expenses_{year} PARTITION OF expenses_new "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+    else:
+        op.execute(f"CREATE TABLE expenses_new ({COLUMN_DEFINITIONS})")
+
+    op.execute(f"INSERT INTO expenses_new ({COLUMNS}) SELECT {COLUMNS} FROM expenses")
+    op.execute("DROP TABLE expenses")
+    op.execute("ALTER TABLE expenses_new RENAME TO expenses")
+    op.execute("ALTER SEQUENCE expenses_id_seq OWNED BY expenses.id")
+
+
+def upgrade() -> None:
+    """
+    Partitionne expenses par exercice (année civile de expense_date).
+    Les requêtes filtrées par date ne lisent que les partitions concernées ;
+    un exercice clos se VACUUM, s'archive ou se détache à part.
+
+    La clé primaire devient (id, expense_date) : PostgreSQL impose la clé
+    de partitionnement dans toute contrainte d'unicité. Les id restent
+    uniques (séquence unique).
+
+    Une partition est créée pour chaque exercice présent dans les données
+    avant la copie. Les exercices suivants sont créés par
+    ensure_expense_partition(année), appelée au démarrage de l'API ; en
+    attendant, expenses_default reçoit les lignes hors des partitions
+    existantes (exercice futur, dépense antidatée d'une année sans partition).
+
+    expenses_default contenant déjà des lignes : ensure_expense_partition
+    (année) déplace d'abord celles de l'exercice dans la nouvelle partition,
+    puis l'attache (ATTACH échouerait sinon) ; l'ATTACH parcourt
+    expenses_default pour valider la contrainte, sous verrou. Pour un
+    exercice passé, l'appeler à la main :
+    SELECT ensure_expense_partition(2019);
+
+    Réécrit toute la table sous verrou exclusif : à passer hors activité.
+    """
+    _replace_expenses_table(partitioned=True)
+    _create_keys_and_indexes(['id', 'expense_date'])
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    op.execute("ANALYZE expenses")
+
+
+def downgrade() -> None:
+    """
+    Revenir à une table expenses non partitionnée (clé primaire id).
+    """
+    op.execute("DROP FUNCTION IF EXISTS ensure_expense_partition(integer)")
+    _replace_expenses_table(partitioned=False)
+    _create_keys_and_indexes(['id'])
+    op.execute("ANALYZE expenses")
@@ -0,0 +1,91 @@
+"""add_contact_duplicate_keys
+
+Revision ID: e5a9c3d7f1b4
+Revises: d4f7b2e9a1c6
+Create Date: 2026-10-18 17:10:00.000000
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c3d7f1b4'
+down_revision: Union[str, None] = 'd4f7b2e9a1c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# Copie figée de app.normalize.contact_name_key à la date de cette
+# migration : une évolution ultérieure de la normalisation ne doit pas
+# changer ce que la migration écrit
+NAME_STOPWORDS = {
+    "sa", "sas", "sasu", "sarl", "eurl", "sci", "snc", "scop", "earl", "gie", "ets", "etablissements", "cie",
+    "m", "mr", "mme", "mlle", "monsieur", "madame", "mademoiselle", "dr", "pere", "abbe", "soeur", "frere", "mgr",
+    "et", "de", "du", "des", "la", "le", "les", "l", "d",
+}
+_ABBREVIATION = re.compile(r"(?<=\w)[.'’](?=\w)|(?<=\w)\.$")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _name_key(name):
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    text = _ABBREVIATION.sub("", text)
+    merged = []
+    for token in _NON_ALNUM.sub(" ", text).split():
+        # Sigle épelé : lettres isolées consécutives
+        if len(token) == 1 and merged and merged[-1][1]:
+            merged[-1] = (merged[-1][0] + token, True)
+        else:
+            merged.append((token, len(token) == 1))
+    words = [word for word, _ in merged if word not in NAME_STOPWORDS]
+    return " ".join(sorted(words or [word for word, _ in merged]))[:200]
+
+
+def upgrade() -> None:
+    """
+    Clés de blocage de la détection des doublons de contacts :
+    colonne name_key (nom normalisé, calculé en Python par une copie
+    figée de la normalisation du modèle), index sur name_key, (zip_code, name_key) et IBAN normalisé.
+    """
+    op.add_column('contacts', sa.Column('name_key', sa.String(length=200), nullable=True))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT id, name FROM contacts WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE contacts SET name_key = :name_key WHERE id = :id"),
+            [{"id": row.id, "name_key": _name_key(row.name)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.create_index('ix_contacts_name_key', 'contacts', ['name_key'], unique=False)
+    op.create_index('ix_contacts_zip_code_name_key', 'contacts', ['zip_code', 'name_key'], unique=False)
+    op.create_index(
+        'ix_contacts_iban_key',
+        'contacts',
+        [sa.text("upper(replace(iban, ' ', ''))")],
+        unique=False,
+        postgresql_where=sa.text('iban IS NOT NULL')
+    )
+    op.execute("ANALYZE contacts")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_iban_key', table_name='contacts')
+    op.drop_index('ix_contacts_zip_code_name_key', table_name='contacts')
+    op.drop_index('ix_contacts_name_key', table_name='contacts')
+    op.drop_column('contacts', 'name_key')
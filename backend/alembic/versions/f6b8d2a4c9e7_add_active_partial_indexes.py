@@ -0,0 +1,56 @@
+"""add_active_partial_indexes
+
+Revision ID: f6b8d2a4c9e7
+Revises: e5a9c3d7f1b4
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b8d2a4c9e7'
+down_revision: Union[str, None] = 'e5a9c3d7f1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index partiels -> (table, colonnes, INCLUDE, prédicat)
+PARTIAL_INDEXES = {
+    'ix_contacts_active_id': ('contacts', ['id'], ['updated_at'], 'active'),
+    'ix_contacts_active_contact_type_id': ('contacts', ['contact_type', 'id'], ['updated_at'], 'active'),
+    'ix_users_active_id': ('users', ['id'], [], 'is_active'),
+    'ix_users_active_role_id': ('users', ['role', 'id'], [], 'is_active'),
+}
+
+
+def upgrade() -> None:
+    """
+    Index partiels restreints aux lignes actives : les listes filtrent
+    par défaut sur active / is_active, et ces index restent petits quand
+    les contacts archivés s'accumulent. INCLUDE (updated_at) : l'agrégat
+    de l'ETag des contacts se fait en parcours d'index seul.
+    L'index booléen ix_contacts_active (peu sélectif) est supprimé.
+    Construction CONCURRENTLY : pas de verrou d'écriture.
+    """
+    with op.get_context().autocommit_block():
+        for name, (table, columns, include, predicate) in PARTIAL_INDEXES.items():
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_include=include,
+                postgresql_where=sa.text(predicate),
+                postgresql_concurrently=True
+            )
+        op.drop_index('ix_contacts_active', table_name='contacts', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contacts_active', 'contacts', ['active'], unique=False, postgresql_concurrently=True)
+        for name, (table, _, _, _) in PARTIAL_INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
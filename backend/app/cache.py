@@ -0,0 +1,124 @@
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import CATEGORY_CACHE_CHECK_INTERVAL
+from app.database import open_read_session, replica_engine
+from app.models import Category, CacheVersion
+from app.schemas import CategoryResponse
+
+
+# Versions des données reprises par les réponses des dépenses (noms des
+# utilisateurs et contacts liés), incrémentées à chaque modification
+USERS_VERSION = "users"
+CONTACTS_VERSION = "contacts"
+
+
+async def bump_cache_version(db: AsyncSession, name: str):
+  """
+  Incrémente la version partagée name, à appeler avant le commit
+  de la modification (même transaction).
+  """
+  await db.execute(
+    insert(CacheVersion)
+    .values(name=name, version=1)
+    .on_conflict_do_update(
+      index_elements=[CacheVersion.name],
+      set_={"version": CacheVersion.version + 1, "updated_at": func.now()}
+    )
+  )
+
+
+class CategoryCache:
+  """
+  Cache mémoire (par worker) des catégories, indexé par id et par code PCG.
+
+  Le plan comptable change rarement : les contrôles d'existence et les
+  listes sont servis depuis la mémoire. Chaque modification incrémente la
+  version « categories » de la table cache_versions, dans la même
+  transaction ; les workers relisent cette version au plus toutes les
+  CATEGORY_CACHE_CHECK_INTERVAL secondes et rechargent si elle a changé.
+  Le worker qui modifie vide son cache immédiatement (clear).
+
+  Le cache, partagé par toutes les requêtes du worker, est toujours
+  rechargé depuis le primaire (jamais depuis une réplique en retard), et
+  une version inférieure à la dernière vue n'est jamais retenue.
+  """
+
+  name = "categories"
+
+  def __init__(self, check_interval: float = CATEGORY_CACHE_CHECK_INTERVAL):
+    self.check_interval = check_interval
+    self._by_id: Dict[int, CategoryResponse] = {}
+    self._by_code: Dict[str, CategoryResponse] = {}
+    self._version: Optional[int] = None
+    self._loaded = False
+    self._checked_at = 0.0
+
+  async def _refresh(self, db: AsyncSession):
+    """
+    Recharge les catégories si la version en base a augmenté.
+    La session de l'appelant n'est utilisée que si elle est sur le primaire.
+    """
+    now = time.monotonic()
+    if self._loaded and now - self._checked_at < self.check_interval:
+      return
+
+    if replica_engine is not None and db.bind is replica_engine:
+      async with await open_read_session(primary=True) as primary_db:
+        await self._load(primary_db)
+    else:
+      await self._load(db)
+    self._checked_at = now
+
+  async def _load(self, db: AsyncSession):
+    # Lire la version avant les lignes : une modification concurrente
+    # provoquera au pire un rechargement de plus au prochain contrôle
+    version = await db.scalar(
+      select(CacheVersion.version).where(CacheVersion.name == self.name)
+    ) or 0
+    if self._loaded and self._version is not None and version <= self._version:
+      return
+    categories = (await db.scalars(select(Category).order_by(Category.id))).all()
+    snapshots = [CategoryResponse.model_validate(category) for category in categories]
+    self._by_id = {category.id: category for category in snapshots}
+    self._by_code = {category.code: category for category in snapshots if category.code}
+    self._version = version if self._version is None else max(self._version, version)
+    self._loaded = True
+
+  async def get(self, db: AsyncSession, category_id: int) -> Optional[CategoryResponse]:
+    """Catégorie par id (None si inconnue)"""
+    await self._refresh(db)
+    return self._by_id.get(category_id)
+
+  async def get_by_code(self, db: AsyncSession, code: str) -> Optional[CategoryResponse]:
+    """Catégorie par code PCG (None si inconnu)"""
+    await self._refresh(db)
+    return self._by_code.get(code)
+
+  async def all(self, db: AsyncSession) -> List[CategoryResponse]:
+    """Toutes les catégories, triées par id"""
+    await self._refresh(db)
+    return list(self._by_id.values())
+
+  async def bump_version(self, db: AsyncSession):
+    """
+    Incrémente la version partagée, à appeler avant le commit
+    de toute modification des catégories (même transaction).
+    """
+    await bump_cache_version(db, self.name)
+
+  def clear(self):
+    """
+    Vide le cache local : rechargement à la prochaine lecture.
+    La dernière version vue est conservée (jamais de retour en arrière).
+    """
+    self._by_id = {}
+    self._by_code = {}
+    self._loaded = False
+
+
+category_cache = CategoryCache()
@@ -0,0 +1,100 @@
+import os
+
+# Réglages de l'application, lus depuis l'environnement (.env via direnv)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+  """Lit un booléen d'environnement ("1", "true", "yes", "on")"""
+  value = os.getenv(name)
+  if value is None:
+    return default
+  return value.strip().lower() in ("1", "true", "yes", "on")
+
+# === Base de données : pool de connexions (par worker uvicorn) ===
+# Connexions gardées ouvertes en permanence
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# Connexions supplémentaires autorisées lors des pics
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Attente maximum (secondes) d'une connexion libre avant erreur
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Âge maximum (secondes) d'une connexion avant renouvellement (-1 : jamais)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Vérifier la connexion (SELECT 1) avant chaque emprunt
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+# "session" : Postgres direct, ou PgBouncer en pool_mode=session
+# "transaction" : PgBouncer en pool_mode=transaction (pas de requêtes
+# préparées côté serveur, aucun état de session réutilisé)
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "session")
+
+# === Réplique en lecture (optionnelle, DATABASE_REPLICA_URL) ===
+# Secondes pendant lesquelles un client lit sur le primaire après une
+# écriture (lire ses propres écritures malgré le retard de la réplique)
+DB_REPLICA_STALENESS_WINDOW = int(os.getenv("DB_REPLICA_STALENESS_WINDOW", "5"))
+# Délai (secondes) de connexion à la réplique avant repli sur le primaire
+DB_REPLICA_CONNECT_TIMEOUT = float(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "2"))
+# Secondes sans essayer la réplique après un échec de connexion
+DB_REPLICA_RETRY_INTERVAL = float(os.getenv("DB_REPLICA_RETRY_INTERVAL", "30"))
+
+# === Pagination ===
+# Durée de vie (secondes) des totaux mis en cache (count=cached)
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "30"))
+# Nombre maximum de jeux de filtres conservés dans ce cache
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv("COUNT_CACHE_MAX_ENTRIES", "1024"))
+
+# === Mots de passe (bcrypt) ===
+# Facteur de coût bcrypt des nouveaux hash (12 ≈ 250 ms par hash)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads dédiés au hachage (bcrypt libère le GIL pendant le calcul)
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", "2"))
+# Hachages en cours ou en attente au-delà desquels on répond 503
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", "32"))
+# Re-hacher au coût actuel lors d'une vérification réussie
+BCRYPT_REHASH_ON_VERIFY = _env_bool("BCRYPT_REHASH_ON_VERIFY", False)
+
+# === Création en lot des dépenses ===
+# Dépenses au maximum par appel à POST /api/expenses/batch
+EXPENSE_BATCH_MAX_SIZE = int(os.getenv("EXPENSE_BATCH_MAX_SIZE", "1000"))
+
+# === Import CSV des dépenses ===
+# Lignes validées et insérées par lot (une requête de résolution par lot)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+# Erreurs détaillées au maximum dans le compte rendu
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+# === Export des dépenses ===
+# Lignes lues par aller-retour du curseur serveur (et par morceau envoyé)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# === Cache mémoire des catégories ===
+# Délai max. (s) avant qu'un worker voie une modification faite par un autre
+CATEGORY_CACHE_CHECK_INTERVAL = float(os.getenv("CATEGORY_CACHE_CHECK_INTERVAL", "5"))
+
+# === Chargement en masse des contacts (upsert) ===
+# Contacts au maximum par appel à POST /api/contacts/upsert
+CONTACT_UPSERT_MAX_SIZE = int(os.getenv("CONTACT_UPSERT_MAX_SIZE", "10000"))
+# Contacts validés et écrits par lot (un INSERT ... ON CONFLICT par lot)
+CONTACT_UPSERT_BATCH_SIZE = int(os.getenv("CONTACT_UPSERT_BATCH_SIZE", "500"))
+
+# === Validation des SIRET en lot ===
+# SIRET au maximum par appel à POST /api/contacts/validate-siret
+SIRET_BATCH_MAX_SIZE = int(os.getenv("SIRET_BATCH_MAX_SIZE", "50000"))
+
+# === Détection des doublons de contacts ===
+# Score (0 à 1) à partir duquel deux contacts sont signalés comme doublons
+CONTACT_DUPLICATE_THRESHOLD = float(os.getenv("CONTACT_DUPLICATE_THRESHOLD", "0.85"))
+# Blocs (contacts partageant une clé) plus grands ignorés par le rapport
+CONTACT_DUPLICATE_MAX_BLOCK = int(os.getenv("CONTACT_DUPLICATE_MAX_BLOCK", "50"))
+
+# === Partitions des dépenses (une par exercice) ===
+# Exercices à venir dont la partition est créée au démarrage de l'API
+EXPENSE_PARTITIONS_AHEAD = int(os.getenv("EXPENSE_PARTITIONS_AHEAD", "1"))
+
+# === Budget de requêtes SQL (développement et tests) ===
+# Compter les requêtes SQL de chaque requête HTTP et signaler les dépassements
+QUERY_BUDGET_ENABLED = _env_bool("QUERY_BUDGET_ENABLED", False)
+# Budget des routes sans budget propre (voir app/query_budget.py)
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "10"))
+# Budgets supplémentaires : "GET /api/expenses/=3;POST /api/expenses/=5"
+QUERY_BUDGETS = os.getenv("QUERY_BUDGETS", "")
+# Lever QueryBudgetExceeded au lieu de journaliser (fait échouer les tests)
+QUERY_BUDGET_RAISE = _env_bool("QUERY_BUDGET_RAISE", False)
@@ -0,0 +1,248 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import CONTACT_DUPLICATE_MAX_BLOCK, CONTACT_DUPLICATE_THRESHOLD
+from app.enums import ContactType
+from app.models import Contact
+from app.normalize import contact_name_key, normalize_iban, normalize_phone, normalize_text
+from app.schemas import ContactCreate, ContactDuplicateCandidate, ContactDuplicatePair, ContactDuplicateReport
+
+# Longueur du préfixe de name_key dans la clé d'adresse
+PLACE_PREFIX_LENGTH = 3
+# Candidats lus au maximum pour vérifier un nouveau contact
+CREATE_CHECK_LIMIT = 50
+
+
+class ContactKeys(NamedTuple):
+  """Colonnes d'un contact utiles à la comparaison"""
+  id: int
+  contact_type: ContactType
+  name: str
+  name_key: Optional[str]
+  email: Optional[str]
+  phone: Optional[str]
+  mobile: Optional[str]
+  zip_code: Optional[str]
+  city: Optional[str]
+  siret: Optional[str]
+  iban: Optional[str]
+
+
+KEY_COLUMNS = [getattr(Contact, field) for field in ContactKeys._fields]
+
+
+class PreparedContact(NamedTuple):
+  """Contact et ses champs normalisés une seule fois avant les comparaisons"""
+  contact: ContactKeys
+  city: str
+  iban: str
+  email: str
+  phones: frozenset
+
+
+def prepare(contact: ContactKeys) -> PreparedContact:
+  return PreparedContact(
+    contact,
+    normalize_text(contact.city),
+    normalize_iban(contact.iban),
+    (contact.email or "").lower(),
+    frozenset({normalize_phone(contact.phone), normalize_phone(contact.mobile)} - {""}),
+  )
+
+
+def blocking_keys(prepared: PreparedContact) -> List[tuple]:
+  """
+  Clés de blocage : seuls les contacts partageant au moins une clé sont
+  comparés. Nom normalisé, SIRET, IBAN, et adresse (code postal, ville,
+  début du nom) pour les noms mal orthographiés au même endroit.
+  """
+  contact = prepared.contact
+  keys = []
+  if contact.name_key:
+    keys.append(("name", contact.name_key))
+  if contact.siret:
+    keys.append(("siret", contact.siret))
+  if prepared.iban:
+    keys.append(("iban", prepared.iban))
+  if contact.zip_code and contact.name_key:
+    keys.append(("place", contact.zip_code, prepared.city, contact.name_key[:PLACE_PREFIX_LENGTH]))
+  return keys
+
+
+def score_pair(a: PreparedContact, b: PreparedContact, threshold: float = 0.0) -> Tuple[float, List[str]]:
+  """
+  Ressemblance de deux contacts (0 à 1) et raisons.
+  Base : similarité des noms normalisés. Une adresse identique la
+  renforce, des codes postaux différents l'affaiblissent ; un
+  identifiant commun (SIRET, IBAN, email, téléphone) la porte à 0,9 au moins.
+  Une paire que les bornes rapides de difflib placent sous threshold
+  reçoit 0, sans calcul complet de la similarité.
+  """
+  ca, cb = a.contact, b.contact
+  identifiers = [
+    ("same_siret", ca.siret and ca.siret == cb.siret),
+    ("same_iban", a.iban and a.iban == b.iban),
+    ("same_email", a.email and a.email == b.email),
+    ("same_phone", a.phones & b.phones),
+  ]
+  shared = [reason for reason, matched in identifiers if matched]
+
+  # Adresse : score = weight * similarité des noms + bonus
+  reasons = []
+  weight, bonus = 1.0, 0.0
+  if ca.zip_code and cb.zip_code:
+    if ca.zip_code == cb.zip_code and a.city == b.city:
+      reasons.append("same_address")
+      weight, bonus = 0.8, 0.2
+    elif ca.zip_code != cb.zip_code:
+      weight = 0.8
+
+  if ca.name_key == cb.name_key:
+    name_score = 1.0 if ca.name_key else 0.0
+  else:
+    matcher = SequenceMatcher(None, ca.name_key or "", cb.name_key or "")
+    # Bornes supérieures rapides : inutile de calculer ratio() si même
+    # la borne n'atteint pas le seuil (sauf identifiant commun)
+    if not shared and (
+      weight * matcher.real_quick_ratio() + bonus < threshold
+      or weight * matcher.quick_ratio() + bonus < threshold
+    ):
+      return 0.0, []
+    name_score = matcher.ratio()
+
+  if name_score == 1.0:
+    reasons.insert(0, "same_name")
+  elif name_score >= 0.8:
+    reasons.insert(0, "similar_name")
+  score = weight * name_score + bonus
+  if shared:
+    reasons += shared
+    score = max(score, 0.9 + 0.1 * name_score)
+
+  return round(score, 3), reasons
+
+
+def find_duplicate_pairs(
+  contacts: Iterable[ContactKeys],
+  threshold: float,
+  max_block: int = CONTACT_DUPLICATE_MAX_BLOCK
+) -> Tuple[List[Tuple[ContactKeys, ContactKeys, float, List[str]]], int, int]:
+  """
+  Paires de contacts au score >= threshold, meilleurs scores d'abord.
+  Comparaisons limitées aux blocs (contacts partageant une clé) : coût
+  quasi linéaire, au lieu de comparer toutes les paires. Les blocs de
+  plus de max_block contacts (nom très courant...) sont ignorés.
+
+  Returns:
+    Tuple (paires, nombre de paires comparées, nombre de blocs ignorés)
+  """
+  blocks: Dict[tuple, List[PreparedContact]] = defaultdict(list)
+  for contact in contacts:
+    prepared = prepare(contact)
+    for key in blocking_keys(prepared):
+      blocks[key].append(prepared)
+
+  seen = set()
+  pairs = []
+  oversized = 0
+  for members in blocks.values():
+    if len(members) > max_block:
+      oversized += 1
+      continue
+    for index, a in enumerate(members):
+      for b in members[index + 1:]:
+        if a.contact.id > b.contact.id:
+          a, b = b, a
+        pair_ids = (a.contact.id, b.contact.id)
+        if pair_ids in seen:
+          continue
+        seen.add(pair_ids)
+        score, reasons = score_pair(a, b, threshold)
+        if score >= threshold:
+          pairs.append((a.contact, b.contact, score, reasons))
+
+  pairs.sort(key=lambda pair: (-pair[2], pair[0].id, pair[1].id))
+  return pairs, len(seen), oversized
+
+
+async def duplicate_report(
+  db: AsyncSession,
+  threshold: float = CONTACT_DUPLICATE_THRESHOLD,
+  contact_type: Optional[ContactType] = None,
+  limit: int = 100
+) -> ContactDuplicateReport:
+  """Rapport des doublons probables sur toute la table (ou un type de contact)"""
+  query = select(*KEY_COLUMNS)
+  if contact_type:
+    query = query.where(Contact.contact_type == contact_type)
+  contacts = [ContactKeys(*row) for row in (await db.execute(query)).all()]
+
+  # Comparaisons en Python : hors de la boucle d'évènements
+  pairs, compared, oversized = await run_in_threadpool(find_duplicate_pairs, contacts, threshold)
+  return ContactDuplicateReport(
+    threshold=threshold,
+    contacts_scanned=len(contacts),
+    compared_pairs=compared,
+    oversized_blocks=oversized,
+    pairs=[
+      ContactDuplicatePair(
+        contact_id=a.id, contact_name=a.name, duplicate_id=b.id, duplicate_name=b.name, score=score, reasons=reasons
+      )
+      for a, b, score, reasons in pairs[:limit]
+    ],
+    pairs_truncated=len(pairs) > limit,
+  )
+
+
+async def find_contact_duplicates(
+  db: AsyncSession,
+  contact: ContactCreate,
+  threshold: float = CONTACT_DUPLICATE_THRESHOLD
+) -> List[ContactDuplicateCandidate]:
+  """
+  Contacts existants ressemblant à un contact à créer.
+  Une requête sur les clés de blocage, servie par les index
+  (name_key, siret, IBAN normalisé, code postal + name_key).
+  """
+  new = ContactKeys(
+    id=0,
+    name_key=contact_name_key(contact.name),
+    **contact.model_dump(include={"contact_type", "name", "email", "phone", "mobile", "zip_code", "city", "siret", "iban"})
+  )
+  identifiers = []
+  if new.siret:
+    identifiers.append(Contact.siret == new.siret)
+  if new.iban:
+    identifiers.append(func.upper(func.replace(Contact.iban, " ", "")) == normalize_iban(new.iban))
+  conditions = [Contact.name_key == new.name_key, *identifiers]
+  if new.zip_code and new.name_key:
+    conditions.append(and_(
+      Contact.zip_code == new.zip_code,
+      func.left(Contact.name_key, PLACE_PREFIX_LENGTH) == new.name_key[:PLACE_PREFIX_LENGTH]
+    ))
+
+  query = select(*KEY_COLUMNS).where(or_(*conditions)).limit(CREATE_CHECK_LIMIT)
+  # Nom très courant : les contacts au même SIRET ou IBAN d'abord
+  if identifiers:
+    query = query.order_by(or_(*identifiers).desc())
+  rows = (await db.execute(query)).all()
+  candidates = []
+  prepared_new = prepare(new)
+  for existing in (ContactKeys(*row) for row in rows):
+    score, reasons = score_pair(prepared_new, prepare(existing), threshold)
+    if score >= threshold:
+      candidates.append(ContactDuplicateCandidate(
+        id=existing.id,
+        contact_type=existing.contact_type,
+        name=existing.name,
+        city=existing.city,
+        siret=existing.siret,
+        score=score,
+        reasons=reasons
+      ))
+  return sorted(candidates, key=lambda candidate: -candidate.score)
@@ -44,5 +44,57 @@ class ContactType(str, Enum):
     DIOCESE = "diocese"
     OTHER = "other"
     
+    def __str__(self):
+        return self.value
+
+class CountMode(str, Enum):
+    """
+    Modes de calcul du total des listes paginées.
+    
+    - EXACT: COUNT(*) sur la requête filtrée
+    - ESTIMATED: Estimation du planificateur PostgreSQL (EXPLAIN)
+    - CACHED: COUNT(*) mis en cache quelques secondes par jeu de filtres
+    - NONE: Pas de total (pagination par next_cursor uniquement)
+    """
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+    NONE = "none"
+    
+    def __str__(self):
+        return self.value
+
+
+class ExportFormat(str, Enum):
+    """
+    Formats d'export des listes.
+    
+    - CSV: Séparateur ; (ouvrable tel quel dans un tableur français)
+    - NDJSON: Un objet JSON par ligne
+    """
+    CSV = "csv"
+    NDJSON = "ndjson"
+    
+    def __str__(self):
+        return self.value
+
+class ExpenseGroupBy(str, Enum):
+    """
+    Axes de regroupement du récapitulatif des dépenses.
+    
+    - CATEGORY: Catégorie (id, code PCG, nom)
+    - CONTACT: Fournisseur (id, nom)
+    - USER: Utilisateur ayant soumis la dépense
+    - STATUS: Statut
+    - MONTH: Mois (avec l'année)
+    - YEAR: Année
+    """
+    CATEGORY = "category"
+    CONTACT = "contact"
+    USER = "user"
+    STATUS = "status"
+    MONTH = "month"
+    YEAR = "year"
+    
     def __str__(self):
         return self.value
\ No newline at end of file
@@ -9,6 +9,21 @@ class ContactNotFoundException(HTTPException):
     )
 
 
+class PossibleDuplicateContactException(HTTPException):
+  """
+  Exception levée à la création d'un contact qui ressemble à des
+  contacts existants. Le client peut confirmer avec ?force=true.
+  """
+  def __init__(self, candidates: list):
+    super().__init__(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+          "message": "Possible duplicate contacts found, retry with force=true to create anyway",
+          "candidates": candidates,
+        }
+    )
+
+
 # === Exceptions communes ===
 class DuplicateEmailException(HTTPException):
   """
@@ -31,4 +46,28 @@ class InvalidSiretException(HTTPException):
     super().__init__(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         detail=f"Invalid SIRET number: '{siret}'. Must be 14 digits."
+    )
+
+class InvalidCursorException(HTTPException):
+  """
+  Exception levée quand un curseur de pagination est illisible
+  ou ne correspond pas au tri de la liste demandée.
+  """
+  def __init__(self, cursor: str):
+    super().__init__(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Invalid pagination cursor: '{cursor}'"
+    )
+
+
+class HashingPoolBusyException(HTTPException):
+  """
+  Exception levée quand trop de hachages de mots de passe sont en attente.
+  Le client peut réessayer après quelques instants.
+  """
+  def __init__(self):
+    super().__init__(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Password hashing is saturated, please retry shortly",
+        headers={"Retry-After": "1"}
     )
\ No newline at end of file
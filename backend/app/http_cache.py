@@ -0,0 +1,83 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(*parts: Any) -> str:
+  """
+  ETag faible (W/"...") calculé à partir des éléments fournis.
+  Faible : deux réponses de même ETag sont équivalentes, pas identiques
+  à l'octet près (noms des objets liés, sérialisation...).
+  """
+  digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+  return f'W/"{digest}"'
+
+
+def detail_etag(kind: str, row_id: int, updated_at: datetime, *related: Optional[datetime]) -> str:
+  """
+  ETag d'une ressource unique : sa date de dernière modification, et
+  celles des objets liés dont la réponse reprend des champs (noms...)
+  """
+  return make_etag(kind, row_id, *(value.isoformat() if value else None for value in (updated_at, *related)))
+
+
+async def list_etag(
+  db: AsyncSession,
+  request: Request,
+  query: Select,
+  updated_column: Any,
+  related: Sequence[Any] = ()
+) -> Tuple[str, int]:
+  """
+  ETag d'une liste filtrée, en une requête d'agrégat (sans lire les lignes).
+
+  Combine max(updated_at) (ajouts et modifications), le nombre de lignes
+  (suppressions) et les paramètres de la requête (filtres, page, curseur).
+  related : expressions scalaires supplémentaires (ex: max(updated_at)
+  d'une table jointe) qui doivent aussi changer l'ETag.
+
+  Args:
+    db: Session asynchrone
+    request: Requête HTTP (paramètres de l'URL)
+    query: Requête filtrée (sans tri ni pagination)
+    updated_column: Colonne updated_at du modèle listé
+    related: Expressions ajoutées à l'agrégat (sous-requêtes scalaires)
+
+  Returns:
+    Tuple (ETag, nombre de lignes) : le nombre sert de total exact
+  """
+  last_update, total, *related_values = (await db.execute(
+    query.with_only_columns(func.max(updated_column), func.count(), *related, maintain_column_froms=True)
+  )).one()
+  params = sorted(request.query_params.multi_items())
+  etag = make_etag(
+    request.url.path,
+    params,
+    *(value.isoformat() if isinstance(value, datetime) else value for value in (last_update, total, *related_values))
+  )
+  return etag, total
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+  """Vrai si l'ETag figure dans If-None-Match (comparaison faible)"""
+  header = request.headers.get("if-none-match")
+  if not header:
+    return False
+  if header.strip() == "*":
+    return True
+  candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+  return etag.removeprefix("W/") in candidates
+
+
+def not_modified_response(etag: str) -> Response:
+  """Réponse 304 sans corps (rien à sérialiser)"""
+  return Response(status_code=304, headers=cache_headers(etag))
+
+
+def cache_headers(etag: str) -> dict:
+  """En-têtes de validation : le client doit revalider à chaque fois"""
+  return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -0,0 +1,120 @@
+import sys
+import sysconfig
+import time
+import traceback
+from contextvars import ContextVar, Token
+from typing import Dict, List, Optional
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+  """
+  Requêtes SQL exécutées et temps passé en base.
+  Une instance par requête HTTP (via contextvar), plus un total par worker.
+  
+  Si record_statements : garde aussi chaque requête SQL distincte, son
+  nombre d'exécutions et la pile d'appel de la première (détection N+1).
+  """
+  __slots__ = ("queries", "db_seconds", "statements")
+
+  def __init__(self, record_statements: bool = False):
+    self.queries = 0
+    self.db_seconds = 0.0
+    self.statements: Optional[Dict[str, list]] = {} if record_statements else None
+
+  def record(self, seconds: float, statement: Optional[str] = None):
+    self.queries += 1
+    self.db_seconds += seconds
+    if self.statements is not None and statement is not None:
+      entry = self.statements.get(statement)
+      if entry:
+        entry[0] += 1
+      else:
+        self.statements[statement] = [1, _caller_stack()]
+
+
+# Enregistrement des requêtes SQL par requête HTTP (mode budget, coûteux)
+_record_statements = False
+
+
+def enable_statement_recording():
+  """Active l'enregistrement des requêtes SQL pour les requêtes HTTP suivantes"""
+  global _record_statements
+  _record_statements = True
+
+
+# Répertoires des bibliothèques (exclus des piles d'appel)
+_LIBRARY_DIRS = tuple({sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]})
+
+
+def _caller_stack() -> List[traceback.FrameSummary]:
+  """
+  Pile d'appel du code ayant lancé la requête SQL (sans les bibliothèques).
+  Avec le moteur asynchrone, la requête s'exécute dans un greenlet : la
+  pile utile est celle de la coroutine (greenlet parent) qui l'a attendue.
+  """
+  frame = sys._getframe(1)
+  parent = getcurrent().parent
+  if parent is not None and parent.gr_frame is not None:
+    frame = parent.gr_frame
+  return [entry for entry in traceback.extract_stack(frame) if not entry.filename.startswith(_LIBRARY_DIRS)]
+
+
+# Totaux du worker (requêtes HTTP ou non : scripts, tâches de fond...)
+QUERY_TOTALS = QueryStats()
+
+# Statistiques de la requête HTTP en cours ; la contextvar suit la requête
+# jusque dans les greenlets du moteur asynchrone et les threads du pool
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def start_request_stats(record_statements: Optional[bool] = None) -> Token:
+  """
+  Ouvre le suivi des requêtes SQL de la requête HTTP courante.
+  record_statements : None pour suivre enable_statement_recording()
+  """
+  if record_statements is None:
+    record_statements = _record_statements
+  return _current_stats.set(QueryStats(record_statements))
+
+
+def current_request_stats() -> Optional[QueryStats]:
+  """Statistiques de la requête HTTP courante (None hors requête)"""
+  return _current_stats.get()
+
+
+def end_request_stats(token: Token):
+  """Ferme le suivi ouvert par start_request_stats"""
+  _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+  QUERY_TOTALS.record(elapsed)
+  stats = _current_stats.get()
+  if stats is not None:
+    stats.record(elapsed, statement)
+
+
+def _handle_error(exception_context):
+  # Requête en échec : after_cursor_execute n'est pas appelé
+  conn = exception_context.connection
+  if conn is not None and conn.info.get("query_start_time"):
+    conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine):
+  """
+  Compte et chronomètre chaque requête SQL du moteur.
+  Pour un moteur asynchrone, passer async_engine.sync_engine.
+  """
+  event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+  event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+  event.listen(engine, "handle_error", _handle_error)
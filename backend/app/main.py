@@ -1,20 +1,47 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
 from app.routes import contacts, categories, users, expenses
+from app.config import QUERY_BUDGET_ENABLED
+from app.database import async_engine, get_pool_stats
+from app.instrumentation import enable_statement_recording
+from app.metrics import MetricsMiddleware, render_metrics
+from app.partitions import ensure_expense_partitions
+from app.query_budget import QueryBudgetMiddleware
+from app.responses import FastJSONResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # Partitions des dépenses de l'exercice en cours et des suivants
+  await ensure_expense_partitions(async_engine)
+  yield
 
 app = FastAPI(
   title="ParoGest API",
   description="API de gestion comptable pour les paroisses",
-  version="0.1.0"
+  version="0.1.0",
+  # Sérialisation JSON par orjson pour toutes les routes
+  default_response_class=FastJSONResponse,
+  lifespan=lifespan
 )
 
+# Budget de requêtes SQL par route (développement et tests) ; ajouté
+# avant MetricsMiddleware pour s'exécuter à l'intérieur de son suivi
+if QUERY_BUDGET_ENABLED:
+  enable_statement_recording()
+  app.add_middleware(QueryBudgetMiddleware)
+
+# Latence, codes de statut et requêtes SQL par route (servis sur /metrics)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(contacts.router)
 app.include_router(categories.router)
 app.include_router(users.router)
 app.include_router(expenses.router)
 
 @app.get("/")
-def root():
+async def root():
   return {
     "app": "ParoGest API",
     "version": "0.2.0",
@@ -23,5 +50,25 @@ def root():
   }
 
 @app.get("/health")
-def health_check():
-  return {"status": "healthy"}
\ No newline at end of file
+async def health_check():
+  return {"status": "healthy"}
+
+@app.get("/health/pool")
+async def pool_stats():
+  """
+  Compteurs des pools de connexions de ce worker
+  (connexions empruntées, débordement, temps d'attente, timeouts)
+  """
+  return get_pool_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+  """
+  Métriques de ce worker au format Prometheus : latence et codes de
+  statut par route, requêtes en cours, requêtes SQL par requête HTTP,
+  pools de connexions
+  """
+  return PlainTextResponse(
+    render_metrics(get_pool_stats()),
+    media_type="text/plain; version=0.0.4"
+  )
\ No newline at end of file
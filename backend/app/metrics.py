@@ -0,0 +1,178 @@
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+from app.instrumentation import (
+  QUERY_TOTALS,
+  current_request_stats,
+  end_request_stats,
+  start_request_stats
+)
+
+# Bornes des histogrammes (secondes, puis nombre de requêtes SQL)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+  """Histogramme cumulatif au sens Prometheus (bornes « inférieur ou égal »)"""
+  __slots__ = ("bounds", "counts", "sum", "count")
+
+  def __init__(self, bounds: Sequence[float]):
+    self.bounds = bounds
+    # Une case par borne, plus +Inf
+    self.counts = [0] * (len(bounds) + 1)
+    self.sum = 0.0
+    self.count = 0
+
+  def observe(self, value: float):
+    self.counts[bisect_left(self.bounds, value)] += 1
+    self.sum += value
+    self.count += 1
+
+
+class RequestMetrics:
+  """
+  Métriques HTTP et SQL de ce worker, par route (modèle de chemin,
+  ex: /api/expenses/{expense_id}) : pas une série par id demandé.
+  """
+
+  def __init__(self):
+    self.in_flight = 0
+    self.requests: Dict[Tuple[str, str, int], int] = {}
+    self.latency: Dict[Tuple[str, str], Histogram] = {}
+    self.db_queries: Dict[Tuple[str, str], Histogram] = {}
+    self.db_time: Dict[Tuple[str, str], Histogram] = {}
+
+  def observe(self, method: str, route: str, status_code: int, seconds: float, stats):
+    key = (method, route)
+    counter = (method, route, status_code)
+    self.requests[counter] = self.requests.get(counter, 0) + 1
+
+    if key not in self.latency:
+      self.latency[key] = Histogram(LATENCY_BUCKETS)
+      self.db_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+      self.db_time[key] = Histogram(DB_TIME_BUCKETS)
+    self.latency[key].observe(seconds)
+    self.db_queries[key].observe(stats.queries)
+    self.db_time[key].observe(stats.db_seconds)
+
+
+METRICS = RequestMetrics()
+
+
+def _route_label(scope) -> str:
+  """Modèle de chemin de la route (renseigné par le routeur FastAPI)"""
+  route = scope.get("route")
+  return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+  """
+  Middleware ASGI pur (pas de BaseHTTPMiddleware) : mesure chaque requête
+  HTTP sans mettre le corps de la réponse en tampon. Coût par requête :
+  quelques opérations sur des dictionnaires.
+  """
+
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    status_code = 500
+
+    async def send_with_status(message):
+      nonlocal status_code
+      if message["type"] == "http.response.start":
+        status_code = message["status"]
+      await send(message)
+
+    token = start_request_stats()
+    METRICS.in_flight += 1
+    start = time.perf_counter()
+    try:
+      await self.app(scope, receive, send_with_status)
+    finally:
+      elapsed = time.perf_counter() - start
+      METRICS.in_flight -= 1
+      stats = current_request_stats()
+      end_request_stats(token)
+      METRICS.observe(scope["method"], _route_label(scope), status_code, elapsed, stats)
+
+
+# === Rendu au format texte Prometheus ===
+
+def _escape(value) -> str:
+  """Échappement d'une valeur d'étiquette (\\, " et retour à la ligne)"""
+  return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+  pairs = [f'{name}="{_escape(value)}"' for name, value in labels.items()]
+  return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _header(lines: List[str], name: str, kind: str, help_text: str):
+  lines.append(f"# HELP {name} {help_text}")
+  lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: List[str], name: str, help_text: str, series: Dict[Tuple[str, str], Histogram]):
+  _header(lines, name, "histogram", help_text)
+  for (method, route), histogram in sorted(series.items()):
+    cumulative = 0
+    for bound, count in zip(list(histogram.bounds) + ["+Inf"], histogram.counts):
+      cumulative += count
+      lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+
+
+def render_metrics(pool_stats: dict) -> str:
+  """
+  Toutes les métriques du worker au format d'exposition Prometheus.
+
+  Args:
+    pool_stats: Résultat de get_pool_stats()
+
+  Returns:
+    Texte à servir en text/plain; version=0.0.4
+  """
+  lines: List[str] = []
+
+  _header(lines, "parogest_http_requests_total", "counter", "Requêtes HTTP par route et code de statut")
+  for (method, route, status_code), count in sorted(METRICS.requests.items()):
+    lines.append(f"parogest_http_requests_total{_labels(method=method, route=route, status=status_code)} {count}")
+
+  _header(lines, "parogest_http_requests_in_flight", "gauge", "Requêtes HTTP en cours de traitement")
+  lines.append(f"parogest_http_requests_in_flight {METRICS.in_flight}")
+
+  _histogram(lines, "parogest_http_request_duration_seconds", "Durée des requêtes HTTP", METRICS.latency)
+  _histogram(lines, "parogest_db_queries_per_request", "Requêtes SQL par requête HTTP", METRICS.db_queries)
+  _histogram(lines, "parogest_db_seconds_per_request", "Temps passé en base par requête HTTP", METRICS.db_time)
+
+  _header(lines, "parogest_db_queries_total", "counter", "Requêtes SQL exécutées par le worker")
+  lines.append(f"parogest_db_queries_total {QUERY_TOTALS.queries}")
+  _header(lines, "parogest_db_query_seconds_total", "counter", "Temps cumulé des requêtes SQL")
+  lines.append(f"parogest_db_query_seconds_total {QUERY_TOTALS.db_seconds}")
+
+  # Pools de connexions : mêmes valeurs que GET /health/pool
+  pool_metrics = [
+    ("parogest_db_pool_size", "gauge", "size", "Connexions permanentes du pool"),
+    ("parogest_db_pool_checked_out", "gauge", "checked_out", "Connexions empruntées"),
+    ("parogest_db_pool_overflow", "gauge", "overflow", "Connexions de débordement ouvertes"),
+    ("parogest_db_pool_checkouts_total", "counter", "checkouts_total", "Emprunts de connexion"),
+    ("parogest_db_pool_timeouts_total", "counter", "timeouts_total", "Emprunts abandonnés (timeout)"),
+    ("parogest_db_pool_wait_seconds_total", "counter", "wait_seconds_total", "Attente cumulée d'une connexion"),
+    ("parogest_db_pool_wait_seconds_max", "gauge", "wait_seconds_max", "Plus longue attente d'une connexion"),
+  ]
+  for name, kind, key, help_text in pool_metrics:
+    _header(lines, name, kind, help_text)
+    for pool, values in pool_stats.items():
+      lines.append(f"{name}{_labels(pool=pool)} {values[key]}")
+
+  return "\n".join(lines) + "\n"
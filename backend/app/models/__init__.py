@@ -2,5 +2,6 @@ from app.models.contact import Contact
 from app.models.category import Category
 from app.models.user import User
 from app.models.expense import Expense
+from app.models.cache_version import CacheVersion
 
-__all__ = ["Contact", "Category", "User", "Expense"]
\ No newline at end of file
+__all__ = ["Contact", "Category", "User", "Expense", "CacheVersion"]
\ No newline at end of file
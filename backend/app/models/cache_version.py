@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class CacheVersion(Base):
+  """
+  Compteur de version d'un cache mémoire (un par jeu de données).
+  Incrémenté à chaque modification des données ; chaque worker le relit
+  périodiquement et recharge son cache quand il a changé.
+  """
+  
+  __tablename__ = "cache_versions"
+  
+  # Nom du cache (ex: "categories")
+  name = Column(String(50), primary_key=True)
+  
+  # Version courante
+  version = Column(BigInteger, nullable=False, default=0, server_default="0")
+  
+  updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+  
+  def __repr__(self):
+    return f"<CacheVersion(name='{self.name}', version={self.version})>"
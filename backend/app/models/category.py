@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -9,6 +9,12 @@ class Category(Base):
   """
   
   __tablename__ = "categories"
+  # Index trigrammes (pg_trgm) pour les recherches « contient »
+  __table_args__ = (
+    Index("ix_categories_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    Index("ix_categories_code_trgm", "code", postgresql_using="gin", postgresql_ops={"code": "gin_trgm_ops"}),
+    Index("ix_categories_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+  )
   
   # Colonne ID (clé primaire, auto-incrémenté)
   id = Column(Integer, primary_key=True, index=True)
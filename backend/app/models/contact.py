@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Date, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Date, Index, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from app.database import Base
 from app.enums import ContactType
+from app.normalize import contact_name_key
 
 class Contact(Base):
   """
@@ -17,6 +19,24 @@ class Contact(Base):
   - Autre (OTHER)
   """
   __tablename__ = "contacts"
+  # Index trigrammes (pg_trgm) pour les recherches « contient »
+  __table_args__ = (
+    Index("ix_contacts_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    Index("ix_contacts_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    Index("ix_contacts_siret_trgm", "siret", postgresql_using="gin", postgresql_ops={"siret": "gin_trgm_ops"}),
+    Index("ix_contacts_city_trgm", "city", postgresql_using="gin", postgresql_ops={"city": "gin_trgm_ops"}),
+    # Clés de blocage de la détection des doublons (app/duplicates.py)
+    Index("ix_contacts_zip_code_name_key", "zip_code", "name_key"),
+    Index("ix_contacts_iban_key", text("upper(replace(iban, ' ', ''))"), postgresql_where=text("iban IS NOT NULL")),
+    # Email unique sans tenir compte de la casse (cible de l'upsert)
+    Index("ix_contacts_email_lower", text("lower(email)"), unique=True),
+    # Contacts actifs (listes par défaut) : index partiels, INCLUDE pour l'ETag
+    Index("ix_contacts_active_id", "id", postgresql_include=["updated_at"], postgresql_where=text("active")),
+    Index(
+      "ix_contacts_active_contact_type_id", "contact_type", "id",
+      postgresql_include=["updated_at"], postgresql_where=text("active")
+    ),
+  )
   
   # === Identifiant ===
   id = Column(Integer, primary_key=True, index=True)
@@ -28,6 +48,8 @@ class Contact(Base):
   is_company = Column(Boolean, default=False, nullable=False)
   name = Column(String(200), nullable=False, index=True)
   display_name = Column(String(200), nullable=True)
+  # Nom normalisé (voir contact_name_key), tenu à jour avec name
+  name_key = Column(String(200), nullable=True, index=True)
   
   # === Coordonnées ===
   email = Column(String(250), unique=True, nullable=True, index=True)
@@ -62,13 +84,18 @@ class Contact(Base):
   bic = Column(String(11), nullable=True)
   
   # === Gestion ===
-  active = Column(Boolean, default=True, nullable=False, index=True)
+  active = Column(Boolean, default=True, nullable=False)
   notes = Column(Text, nullable=True)
   
   # Timestaps automatiques
   created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
   updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
   
+  @validates("name")
+  def _update_name_key(self, key, name):
+    self.name_key = contact_name_key(name)
+    return name
+  
   def __repr__(self):
     """
     Représentation du modèle (pour le débug)
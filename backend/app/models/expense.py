@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, DECIMAL, Date, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, DECIMAL, Date, ForeignKey, Index, text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from decimal import Decimal
@@ -12,22 +12,34 @@ class Expense(Base):
   """
 
   __tablename__ = "expenses"
+  # Index composites de la liste : filtre d'égalité puis tri (expense_date
+  # desc, id desc) ; updated_at inclus pour l'agrégat de l'ETag
+  __table_args__ = (
+    Index("ix_expenses_expense_date_id", "expense_date", "id", postgresql_include=["updated_at"]),
+    Index("ix_expenses_status_expense_date", "status", "expense_date", "id", postgresql_include=["updated_at"]),
+    Index("ix_expenses_user_id_expense_date", "user_id", "expense_date", "id", postgresql_include=["updated_at"]),
+    Index("ix_expenses_category_id_expense_date", "category_id", "expense_date", "id", postgresql_include=["updated_at"]),
+    # Une partition par exercice (année civile), cf. ensure_expense_partition
+    {"postgresql_partition_by": "RANGE (expense_date)"},
+  )
+  # La clé primaire en base est (id, expense_date) ; id seul suffit à
+  # identifier une dépense (séquence unique)
+  __mapper_args__ = {"primary_key": ["id"]}
   
   #Colone ID (clé primaire, auto-incrémentée)
-  id = Column(Integer, primary_key=True, index=True)
+  id = Column(Integer, primary_key=True, autoincrement=True, index=True)
   amount = Column(DECIMAL(10,2), nullable=False)
   description = Column(Text, nullable=False)
-  expense_date = Column(Date, nullable=False, index=True)
+  expense_date = Column(Date, primary_key=True, nullable=False)
   status = Column(
     SQLEnum(ExpenseStatus),
     nullable=False,
-    default=(ExpenseStatus.DRAFT),
-    index=True
+    default=(ExpenseStatus.DRAFT)
   )
   # Relation (Foreign Keys)
   # Utilisateur qui a soumis la démense
-  user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
-  category_id = Column(Integer, ForeignKey('categories.id'), nullable=False, index=True)
+  user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+  category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
   contact_id = Column(Integer, ForeignKey('contacts.id'), nullable=True, index=True)
   
   # Timestamps
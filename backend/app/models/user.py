@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, Enum as SQLEnum, text
 from sqlalchemy.sql import func
 from app.database import Base
 from app.enums import UserRole
@@ -9,6 +9,15 @@ class User(Base):
     Gère les prêtres, bénévoles, trésoriers et administrateurs.
   """
   __tablename__ = "users"
+  # Index trigrammes (pg_trgm) pour les recherches « contient »
+  __table_args__ = (
+    Index("ix_users_first_name_trgm", "first_name", postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"}),
+    Index("ix_users_last_name_trgm", "last_name", postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"}),
+    Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    # Utilisateurs actifs (listes par défaut) : index partiels
+    Index("ix_users_active_id", "id", postgresql_where=text("is_active")),
+    Index("ix_users_active_role_id", "role", "id", postgresql_where=text("is_active")),
+  )
   
   id = Column(Integer, primary_key=True, index=True)
   email = Column(String(255), unique=True, nullable=False, index=True)
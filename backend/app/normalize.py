@@ -0,0 +1,59 @@
+import re
+import unicodedata
+from typing import Optional
+
+# Formes juridiques, civilités et mots vides ignorés dans la clé de nom
+NAME_STOPWORDS = {
+  "sa", "sas", "sasu", "sarl", "eurl", "sci", "snc", "scop", "earl", "gie", "ets", "etablissements", "cie",
+  "m", "mr", "mme", "mlle", "monsieur", "madame", "mademoiselle", "dr", "pere", "abbe", "soeur", "frere", "mgr",
+  "et", "de", "du", "des", "la", "le", "les", "l", "d",
+}
+
+_ABBREVIATION = re.compile(r"(?<=\w)[.'’](?=\w)|(?<=\w)\.$")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+  """
+  Minuscules, sans accents ni ponctuation, espaces réduits.
+  Les points et apostrophes internes sont supprimés sans espace :
+  « E.D.F. » -> « edf », « Saint-Jean d'Angély » -> « saint jean dangely ».
+  """
+  if not value:
+    return ""
+  text = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode().lower()
+  text = _ABBREVIATION.sub("", text)
+  return " ".join(_NON_ALNUM.sub(" ", text).split())
+
+
+def contact_name_key(name: Optional[str]) -> str:
+  """
+  Clé de blocage d'un nom de contact (colonne contacts.name_key) :
+  texte normalisé, sans formes juridiques ni civilités, lettres isolées
+  regroupées (« E D F » -> « edf ») et mots triés (« Martin Jean » et
+  « Jean Martin » ont la même clé).
+  """
+  tokens = normalize_text(name).split()
+  merged = []
+  for token in tokens:
+    # Sigle épelé : lettres isolées consécutives
+    if len(token) == 1 and merged and merged[-1][1]:
+      merged[-1] = (merged[-1][0] + token, True)
+    else:
+      merged.append((token, len(token) == 1))
+  words = [word for word, _ in merged if word not in NAME_STOPWORDS]
+  # Nom composé uniquement de mots vides (« SARL ») : garder le texte
+  return " ".join(sorted(words or [word for word, _ in merged]))[:200]
+
+
+def normalize_iban(iban: Optional[str]) -> str:
+  """IBAN sans espaces, en majuscules (comparaison et index)"""
+  return "".join((iban or "").split()).upper()
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+  """Chiffres du numéro, indicatif +33 ramené à 0"""
+  digits = re.sub(r"\D", "", phone or "")
+  if digits.startswith("33") and len(digits) == 11:
+    digits = "0" + digits[2:]
+  return digits
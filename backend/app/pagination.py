@@ -0,0 +1,208 @@
+import base64
+import binascii
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import COUNT_CACHE_TTL, COUNT_CACHE_MAX_ENTRIES
+from app.enums import CountMode
+from app.exceptions import InvalidCursorException
+from app.schemas.pagination import PaginationParams
+
+# Cache des totaux : clé (SQL, paramètres) -> (expiration, total)
+# Pas de verrou : seule la boucle asyncio du worker y accède et aucune
+# modification du dictionnaire n'est entrecoupée d'un await
+_count_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+
+class _Explain(Executable, ClauseElement):
+  """Enveloppe une requête dans un EXPLAIN (paramètres liés normalement)"""
+  inherit_cache = False
+
+  def __init__(self, statement):
+    self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+  return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+  """
+  Encode les valeurs de tri d'une ligne en curseur opaque.
+
+  Args:
+    values: Valeurs des colonnes de tri (ex: expense_date, id)
+
+  Returns:
+    Curseur base64 (URL-safe, sans padding)
+  """
+  payload = []
+  for value in values:
+    if isinstance(value, (date, datetime)):
+      value = value.isoformat()
+    elif isinstance(value, Decimal):
+      value = str(value)
+    payload.append(value)
+
+  raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+  return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+  """
+  Décode un curseur et reconvertit chaque valeur au type de sa colonne.
+
+  Args:
+    cursor: Curseur reçu du client
+    columns: Colonnes de tri, dans le même ordre qu'à l'encodage
+
+  Returns:
+    Liste des valeurs typées (date, int, Decimal...)
+  """
+  try:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    payload = json.loads(raw)
+  except (binascii.Error, ValueError):
+    raise InvalidCursorException(cursor)
+
+  if not isinstance(payload, list) or len(payload) != len(columns):
+    raise InvalidCursorException(cursor)
+
+  try:
+    return [_coerce(value, column) for value, column in zip(payload, columns)]
+  except (TypeError, ValueError, ArithmeticError):
+    raise InvalidCursorException(cursor)
+
+
+def _coerce(value: Any, column: Any) -> Any:
+  """Reconvertit une valeur JSON au type Python de la colonne"""
+  python_type = column.type.python_type
+  # datetime hérite de date : le tester en premier
+  if python_type is datetime:
+    return datetime.fromisoformat(value)
+  if python_type is date:
+    return date.fromisoformat(value)
+  if python_type is Decimal:
+    return Decimal(value)
+  if not isinstance(value, python_type):
+    raise TypeError(f"Unexpected cursor value {value!r}")
+  return value
+
+
+async def fetch_page(
+  db: AsyncSession,
+  query: Select,
+  pagination: PaginationParams,
+  order_by: Sequence[Any],
+  descending: bool = False
+) -> Tuple[list, Optional[str]]:
+  """
+  Récupère une page triée sur `order_by`, par décalage ou par curseur.
+
+  Avec un curseur, la requête filtre sur `(col1, col2...) < (v1, v2...)`
+  au lieu d'un OFFSET : le coût d'une page ne dépend plus de sa profondeur.
+  Les colonnes de tri doivent former une clé unique (terminer par l'id).
+
+  Args:
+    db: Session asynchrone
+    query: Requête filtrée (sans tri ni pagination)
+    pagination: Paramètres de pagination (page ou curseur)
+    order_by: Colonnes de tri formant la clé du curseur
+    descending: Tri décroissant sur toutes les colonnes
+
+  Returns:
+    Tuple (éléments de la page, curseur de la page suivante ou None).
+    Les éléments sont les objets ORM pour un select(Modèle), des dict
+    colonne -> valeur pour une projection de plusieurs colonnes.
+  """
+  selected = [description["name"] for description in query.column_descriptions]
+  query = query.add_columns(*order_by).order_by(
+    *[column.desc() if descending else column.asc() for column in order_by]
+  )
+
+  if pagination.cursor:
+    values = decode_cursor(pagination.cursor, order_by)
+    keyset = tuple_(*order_by)
+    bound = tuple_(*values, types=[column.type for column in order_by])
+    query = query.where(keyset < bound if descending else keyset > bound)
+  else:
+    query = query.offset(pagination.skip)
+
+  # Une ligne de plus pour savoir s'il existe une page suivante
+  rows = (await db.execute(query.limit(pagination.limit + 1))).all()
+  has_more = len(rows) > pagination.limit
+  rows = rows[:pagination.limit]
+
+  width = len(selected)
+  next_cursor = encode_cursor(rows[-1][width:]) if has_more else None
+  if width == 1:
+    return [row[0] for row in rows], next_cursor
+  return [dict(zip(selected, row[:width])) for row in rows], next_cursor
+
+
+async def count_total(db: AsyncSession, query: Select, mode: CountMode) -> Optional[int]:
+  """
+  Calcule le total d'une liste filtrée selon le mode demandé.
+
+  Args:
+    db: Session asynchrone
+    query: Requête filtrée (sans tri ni pagination)
+    mode: exact (COUNT), estimated (planificateur), cached (COUNT mis
+      en cache COUNT_CACHE_TTL secondes par jeu de filtres) ou none
+
+  Returns:
+    Le total, ou None si mode none
+  """
+  if mode == CountMode.NONE:
+    return None
+  if mode == CountMode.ESTIMATED:
+    return await _estimate_count(db, query)
+  if mode == CountMode.CACHED:
+    return await _cached_count(db, query)
+  return await _exact_count(db, query)
+
+
+async def _exact_count(db: AsyncSession, query: Select) -> int:
+  """COUNT(*) sur la requête filtrée"""
+  return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+async def _estimate_count(db: AsyncSession, query: Select) -> int:
+  """Nombre de lignes estimé par le planificateur PostgreSQL (sans exécuter)"""
+  plan = (await db.execute(_Explain(query))).scalar()
+  # asyncpg renvoie le JSON en texte, psycopg2 le décode
+  if isinstance(plan, str):
+    plan = json.loads(plan)
+  return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _cached_count(db: AsyncSession, query: Select) -> int:
+  """COUNT(*) mis en cache par requête SQL et valeurs des filtres"""
+  compiled = query.compile(dialect=db.bind.dialect)
+  params = sorted((key, repr(value)) for key, value in compiled.params.items())
+  key = (str(compiled), repr(params))
+  now = time.monotonic()
+
+  cached = _count_cache.get(key)
+  if cached and cached[0] > now:
+    return cached[1]
+
+  total = await _exact_count(db, query)
+
+  if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+    # Purger les entrées expirées, sinon la plus ancienne
+    for expired in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+      del _count_cache[expired]
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+      del _count_cache[next(iter(_count_cache))]
+  _count_cache[key] = (now + COUNT_CACHE_TTL, total)
+  return total
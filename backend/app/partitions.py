@@ -0,0 +1,28 @@
+import logging
+from datetime import date
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import EXPENSE_PARTITIONS_AHEAD
+
+logger = logging.getLogger("parogest.partitions")
+
+
+async def ensure_expense_partitions(engine: AsyncEngine, years_ahead: int = EXPENSE_PARTITIONS_AHEAD) -> None:
+  """
+  Crée les partitions de l'exercice en cours et des `years_ahead`
+  suivants (fonction SQL ensure_expense_partition, idempotente).
+
+  Appelée au démarrage de chaque worker. Un échec n'empêche pas l'API de
+  démarrer : les dépenses hors partition vont dans expenses_default et
+  rejoignent leur partition à sa création.
+  """
+  current_year = date.today().year
+  try:
+    async with engine.begin() as connection:
+      for year in range(current_year, current_year + years_ahead + 1):
+        await connection.execute(text("SELECT ensure_expense_partition(:year)"), {"year": year})
+  except (exc.DBAPIError, OSError) as e:
+    # OSError : base injoignable (asyncpg ne traduit pas ConnectionRefusedError)
+    logger.warning("Could not create expense partitions: %s", e)
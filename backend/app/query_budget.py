@@ -0,0 +1,134 @@
+import logging
+import traceback
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from app.config import QUERY_BUDGET_DEFAULT, QUERY_BUDGETS, QUERY_BUDGET_RAISE
+from app.instrumentation import (
+  QueryStats,
+  current_request_stats,
+  end_request_stats,
+  start_request_stats
+)
+
+logger = logging.getLogger("parogest.query_budget")
+
+# Budgets par route ("MÉTHODE modèle de chemin"), les autres routes ont
+# QUERY_BUDGET_DEFAULT. Un dépassement signale en général un N+1
+# (relation chargée ligne par ligne dans une boucle).
+ENDPOINT_BUDGETS = {
+  # ETag + page (+ total si count=estimated/cached)
+  "GET /api/expenses/": 3,
+  "GET /api/expenses/{expense_id}": 1,
+  "GET /api/expenses/summary": 1,
+  "GET /api/expenses/export": 1,
+  "GET /api/contacts/": 3,
+  "GET /api/contacts/{contact_id}": 1,
+  # Listes servies par le cache (+ version et rechargement éventuels)
+  "GET /api/categories/": 4,
+  "GET /api/categories/{category_id}": 2,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+  """Plus de requêtes SQL que le budget autorisé (QUERY_BUDGET_RAISE)"""
+
+
+def _parse_budgets(value: str) -> Dict[str, int]:
+  """Lit "GET /api/expenses/=3;POST /api/expenses/=5" """
+  budgets = {}
+  for entry in filter(None, (part.strip() for part in value.split(";"))):
+    route, _, limit = entry.rpartition("=")
+    budgets[" ".join(route.split())] = int(limit)
+  return budgets
+
+
+BUDGETS = {**ENDPOINT_BUDGETS, **_parse_budgets(QUERY_BUDGETS)}
+
+
+def budget_for(method: str, route: str) -> int:
+  """Budget de requêtes SQL d'une route"""
+  return BUDGETS.get(f"{method} {route}", QUERY_BUDGET_DEFAULT)
+
+
+def format_report(label: str, stats: QueryStats, limit: int) -> str:
+  """
+  Rapport de dépassement : requêtes les plus répétées (un N+1 apparaît
+  comme la même requête exécutée N fois) et pile d'appel applicative
+  de la plus répétée.
+  """
+  lines = [f"{label}: {stats.queries} SQL queries (budget {limit})"]
+  if not stats.statements:
+    return lines[0]
+
+  ranked = sorted(stats.statements.items(), key=lambda item: item[1][0], reverse=True)
+  for statement, (count, _) in ranked[:5]:
+    lines.append(f"  {count} x {' '.join(statement.split())[:200]}")
+
+  stack = ranked[0][1][1]
+  if stack:
+    lines.append("  Most repeated query issued from:")
+    lines.extend("  " + line.rstrip() for line in traceback.format_list(stack))
+  return "\n".join(lines)
+
+
+def check_budget(label: str, stats: QueryStats, limit: int):
+  """Journalise (ou lève QueryBudgetExceeded) si le budget est dépassé"""
+  if stats.queries <= limit:
+    return
+  report = format_report(label, stats, limit)
+  if QUERY_BUDGET_RAISE:
+    raise QueryBudgetExceeded(report)
+  logger.warning(report)
+
+
+class QueryBudgetMiddleware:
+  """
+  Middleware ASGI (QUERY_BUDGET_ENABLED) : compare le nombre de requêtes
+  SQL de chaque requête HTTP au budget de sa route. Le contrôle a lieu
+  une fois la réponse envoyée ; en mode QUERY_BUDGET_RAISE, l'exception
+  remonte jusqu'au client de test.
+  """
+
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    # Réutiliser le suivi ouvert par MetricsMiddleware s'il existe
+    token = None
+    if current_request_stats() is None:
+      token = start_request_stats(record_statements=True)
+    stats = current_request_stats()
+    try:
+      await self.app(scope, receive, send)
+    finally:
+      if token is not None:
+        end_request_stats(token)
+
+    route = getattr(scope.get("route"), "path", None)
+    if route is not None:
+      method = scope["method"]
+      check_budget(f"{method} {scope['path']} ({route})", stats, budget_for(method, route))
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "block") -> Iterator[QueryStats]:
+  """
+  Pour les tests et scripts : lève QueryBudgetExceeded si le bloc exécute
+  plus de `limit` requêtes SQL (quel que soit QUERY_BUDGET_RAISE).
+
+    with assert_max_queries(2):
+      await get_expenses(...)
+  """
+  token = start_request_stats(record_statements=True)
+  stats = current_request_stats()
+  try:
+    yield stats
+  finally:
+    end_request_stats(token)
+  if stats.queries > limit:
+    raise QueryBudgetExceeded(format_report(label, stats, limit))
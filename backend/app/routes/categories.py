@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 
-from app.database import get_db
+from app.cache import category_cache
+from app.database import get_async_db, get_read_db
+from app.pagination import fetch_page, count_total, encode_cursor, decode_cursor
+from app.search import contains, text_search
 from app.models import Category
 from app.schemas import (
   CategoryCreate,
@@ -12,6 +16,7 @@ from app.schemas import (
   PaginationParams,
   PaginatedResponse
 )
+from app.enums import CountMode
 
 router = APIRouter(
   prefix="/api/categories",
@@ -20,10 +25,10 @@ router = APIRouter(
 
 #CREATE - Créer une catégorie
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+async def create_category(category: CategoryCreate, db: AsyncSession = Depends(get_async_db)):
   try:
     # Vérifier doublon de nom
-    existing_name = db.query(Category).filter(Category.name == category.name).first()
+    existing_name = await db.scalar(select(Category).where(Category.name == category.name))
     if existing_name:
       raise HTTPException(
         status_code=status.HTTP_409_CONFLICT,
@@ -31,7 +36,7 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
       )
     # Vérifier si doublon de code PCG (si fourni)
     if category.code:
-      existing_code = db.query(Category).filter(Category.code == category.code).first()
+      existing_code = await db.scalar(select(Category).where(Category.code == category.code))
       if existing_code:
         raise HTTPException(
           status_code=status.HTTP_409_CONFLICT,
@@ -39,11 +44,13 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
         )
     db_category = Category(**category.model_dump())
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await category_cache.bump_version(db)
+    await db.commit()
+    category_cache.clear()
+    await db.refresh(db_category)
     return db_category
   except IntegrityError as e:
-    db.rollback()
+    await db.rollback()
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail=f"Database integrity error: {str(e)}"
@@ -52,59 +59,90 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
 
 # READ ALL - Lister toutes les catégories
 @router.get("/", response_model=PaginatedResponse[CategoryResponse])
-def get_categories(
+async def get_categories(
   page: int = Query(1, ge=1, description="Page number"),
   page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
   search: Optional[str] = Query(None, description="Rechercher par nom, code ou description"),
   name: Optional[str] = Query(None, description="Rechercher par nom (contient)"),
   code: Optional[str] = Query(None, description="Rechercher par code (exact)"),
-  is_active: Optional[bool] = Query(None, description="Filtrer par état d'activation"),
-  db: Session = Depends(get_db)
+  is_active: Optional[bool] = Query(None, description="Filtrer par état d'activation (défaut : actives)"),
+  include_inactive: bool = Query(False, description="Inclure les catégories désactivées"),
+  cursor: Optional[str] = Query(None, description="Curseur de la page suivante (next_cursor)"),
+  count: CountMode = Query(CountMode.EXACT, description="Calcul du total : exact, estimated, cached ou none"),
+  db: AsyncSession = Depends(get_read_db)
 ):
   # Paramètre de pagination
-  pagination = PaginationParams(page=page, page_size=page_size)
+  pagination = PaginationParams(page=page, page_size=page_size, cursor=cursor)
+  
+  # Catégories actives par défaut
+  if is_active is None and not include_inactive:
+    is_active = True
+  
+  # Sans recherche globale (classée par pertinence en SQL), servir depuis
+  # le cache mémoire : le plan comptable ne compte que quelques centaines de lignes
+  if not search:
+    categories = await category_cache.all(db)
+    if name:
+      categories = [c for c in categories if name.lower() in c.name.lower()]
+    if code:
+      categories = [c for c in categories if c.code == code]
+    if is_active is not None:
+      categories = [c for c in categories if c.is_active == is_active]
+    
+    items, next_cursor = _page_from_cache(categories, pagination)
+    return PaginatedResponse.create(
+      items=items,
+      total=None if count == CountMode.NONE else len(categories),
+      page=page,
+      page_size=page_size,
+      next_cursor=next_cursor,
+      # Le total en mémoire est toujours exact
+      total_kind=CountMode.NONE if count == CountMode.NONE else CountMode.EXACT
+    )
   
   # Construire la requête de base,
-  query = db.query(Category)
+  query = select(Category)
+  # Tri par défaut : id (clé du curseur)
+  order_by = [Category.id]
   
-  # Appliquer les filtres
+  # Appliquer les filtres (« contient » servis par les index trigrammes)
   if search:
-    # Recherche globale (nom OU code OU description)
-    search_filter = f"%{search}%"
-    query = query.filter(
-      (Category.name.ilike(search_filter)) |
-      (Category.code.ilike(search_filter)) |
-      (Category.description.ilike(search_filter))
+    # Recherche globale (nom OU code OU description), plus pertinents d'abord
+    search_filter, rank = text_search(
+      [Category.name, Category.code, Category.description], search
     )
+    query = query.where(search_filter)
+    order_by = [rank, Category.id]
   
   if name:
-    query = query.filter(Category.name.ilike(f"%{name}%"))
+    query = query.where(contains(Category.name, name))
   if code:
-    query = query.filter(Category.code == code)
+    query = query.where(Category.code == code)
   if is_active is not None:
-    query = query.filter(Category.is_active == is_active)
+    query = query.where(Category.is_active == is_active)
   
-  # Compter le total après filtres
-  total = query.count()
+  # Compter le total après filtres (exact, estimé, en cache ou aucun)
+  total = await count_total(db, query, count)
   
   # Récupérer les éléments paginés
-  categories = query \
-    .offset(pagination.skip)\
-    .limit(pagination.limit)\
-    .all()
+  categories, next_cursor = await fetch_page(
+    db, query, pagination, order_by=order_by, descending=bool(search)
+  )
   
   # Créer la réponse paginée
   return PaginatedResponse.create(
     items=categories,
     total=total,
     page=page,
-    page_size=page_size
+    page_size=page_size,
+    next_cursor=next_cursor,
+    total_kind=count
   )
 
 #READ ONE - Récupérer une catgorie par ID
 @router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(category_id: int, db: Session = Depends(get_db)):
-  category = db.query(Category).filter(Category.id == category_id).first()
+async def get_category(category_id: int, db: AsyncSession = Depends(get_read_db)):
+  category = await category_cache.get(db, category_id)
   if not category:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
@@ -114,13 +152,13 @@ def get_category(category_id: int, db: Session = Depends(get_db)):
 
 # UPDATE - Modifier un catégorie
 @router.put("/{category_id}", response_model=CategoryResponse)
-def update_category(
+async def update_category(
   category_id: int,
   category_update: CategoryUpdate,
-  db: Session = Depends(get_db)
+  db: AsyncSession = Depends(get_async_db)
 ):
   try:
-    db_category = db.query(Category).filter(Category.id == category_id).first()
+    db_category = await db.scalar(select(Category).where(Category.id == category_id))
     if not db_category:
       raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -132,10 +170,10 @@ def update_category(
     
     # Vérifier l'unicité du nom si modifié
     if "name" in update_data:
-      existing = db.query(Category).filter(
+      existing = await db.scalar(select(Category).where(
         Category.name == update_data["name"],
         Category.id != category_id
-      ).first()
+      ))
       if existing:
         raise HTTPException(
           status_code=status.HTTP_409_CONFLICT,
@@ -144,10 +182,10 @@ def update_category(
     
     # Vérifier l'unicité du code si modifié
     if "code" in update_data and update_data["code"]:
-      existing = db.query(Category).filter(
+      existing = await db.scalar(select(Category).where(
         Category.code == update_data["code"],
         Category.id != category_id
-      ).first()
+      ))
       if existing:
         raise HTTPException(
           status_code=status.HTTP_409_CONFLICT,
@@ -158,12 +196,14 @@ def update_category(
     for key, value in update_data.items():
       setattr(db_category, key, value)
     
-    db.commit()
-    db.refresh(db_category)
+    await category_cache.bump_version(db)
+    await db.commit()
+    category_cache.clear()
+    await db.refresh(db_category)
     return db_category
     
   except IntegrityError as e:
-    db.rollback()
+    await db.rollback()
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail=f"Database integrity error: {str(e)}"
@@ -171,14 +211,29 @@ def update_category(
 
 # DELETE - Supprimer une catégorie
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(category_id: int, db: Session = Depends(get_db)):
-  db_category = db.query(Category).filter(Category.id == category_id).first()
+async def delete_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+  db_category = await db.scalar(select(Category).where(Category.id == category_id))
   if not db_category:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
       detail=f"Category wi id {category_id} not found"
     )
   
-  db.delete(db_category)
-  db.commit()
-  return None
\ No newline at end of file
+  await db.delete(db_category)
+  await category_cache.bump_version(db)
+  await db.commit()
+  category_cache.clear()
+  return None
+
+def _page_from_cache(categories: List[CategoryResponse], pagination: PaginationParams):
+  """Découpe une liste en mémoire (triée par id), par décalage ou par curseur"""
+  if pagination.cursor:
+    last_id = decode_cursor(pagination.cursor, [Category.id])[0]
+    categories = [c for c in categories if c.id > last_id]
+  else:
+    categories = categories[pagination.skip:]
+  
+  items = categories[:pagination.limit]
+  has_more = len(categories) > pagination.limit
+  next_cursor = encode_cursor([items[-1].id]) if has_more else None
+  return items, next_cursor
\ No newline at end of file
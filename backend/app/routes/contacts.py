@@ -1,19 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.database import get_db
+from app.cache import CONTACTS_VERSION, bump_cache_version
+from app.config import CONTACT_DUPLICATE_THRESHOLD, CONTACT_UPSERT_BATCH_SIZE, IMPORT_MAX_ERRORS
+from app.database import get_async_db, get_read_db
+from app.duplicates import duplicate_report, find_contact_duplicates
+from app.http_cache import cache_headers, detail_etag, is_not_modified, list_etag, not_modified_response
+from app.pagination import fetch_page, count_total
+from app.normalize import contact_name_key
+from app.search import contains, text_search
+from app.validators import validate_sirets
 from app.models import Contact
 from app.schemas import (
   ContactCreate,
   ContactUpdate,
   ContactResponse,
+  ContactDuplicateReport,
+  ContactUpsertRequest,
+  ContactUpsertError,
+  ContactUpsertReport,
+  SiretBatchRequest,
+  SiretBatchReport,
+  SiretValidationResult,
   PaginationParams,
   PaginatedResponse
 )
-from app.enums import ContactType
-from app.exceptions import ContactNotFoundException, DuplicateEmailException
+from app.enums import ContactType, CountMode
+from app.exceptions import ContactNotFoundException, DuplicateEmailException, PossibleDuplicateContactException
 
 router = APIRouter(
   prefix="/api/contacts",
@@ -22,27 +42,39 @@ router = APIRouter(
 
 # CREATE - Créer un fournisseur
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
-def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
+async def create_contact(
+  contact: ContactCreate,
+  force: bool = Query(False, description="Créer même si des contacts ressemblants existent"),
+  db: AsyncSession = Depends(get_async_db)
+):
   """
-  Créer un nouveau contact
+  Créer un nouveau contact.
+  Répond 409 avec les contacts ressemblants (nom, SIRET, IBAN, adresse)
+  s'il y en a, sauf avec force=true.
   """
   try:
     # Verifier si doublon d'email
     if contact.email:
-      existing = db.query(Contact).filter(Contact.email == contact.email).first()
+      existing = await db.scalar(select(Contact).where(func.lower(Contact.email) == contact.email.lower()))
       if existing:
         raise DuplicateEmailException(contact.email)
+    
+    # Vérifier les doublons probables
+    if not force:
+      candidates = await find_contact_duplicates(db, contact)
+      if candidates:
+        raise PossibleDuplicateContactException([candidate.model_dump(mode="json") for candidate in candidates])
   
     db_contact = Contact(**contact.model_dump())
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    await db.refresh(db_contact)
     return db_contact
   
   except IntegrityError as e:
-    db.rollback()
+    await db.rollback()
     # Si c'est une erreur de duplicate email qui n'a pas été catchée
-    if "contact_email_key" in str(e):
+    if "contact_email_key" in str(e) or "ix_contacts_email_lower" in str(e):
       raise DuplicateEmailException(contact.email if contact.email else "unknown")
     # Autre erreur d'intégrité
     raise HTTPException(
@@ -52,9 +84,55 @@ def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
 
 
 
+# UPSERT - Créer ou mettre à jour des contacts en masse
+@router.post("/upsert", response_model=ContactUpsertReport)
+async def upsert_contacts(request: ContactUpsertRequest, db: AsyncSession = Depends(get_async_db)):
+  """
+  Charger une liste de contacts (donateurs, fournisseurs...) : un contact
+  dont l'email existe déjà (sans tenir compte de la casse), ou à défaut
+  le SIRET, est mis à jour ; sinon il est créé. Seuls les champs fournis
+  sont mis à jour.
+
+  Par lots de CONTACT_UPSERT_BATCH_SIZE : SIRET validés en une fois,
+  une requête de résolution des SIRET, un INSERT ... ON CONFLICT DO
+  UPDATE par forme de lot, validé lot par lot. Un contact sans email ni
+  SIRET, invalide ou présent deux fois dans la liste (email sans tenir
+  compte de la casse) est rejeté. Si un lot viole une contrainte, il est
+  repris ligne par ligne : seuls les contacts fautifs sont rejetés.
+  Pas de détection des doublons probables : voir GET /api/contacts/duplicates.
+  """
+  report = ContactUpsertReport()
+  seen_keys: Dict[Tuple[str, str], int] = {}
+  items = list(enumerate(request.contacts))
+  for start in range(0, len(items), CONTACT_UPSERT_BATCH_SIZE):
+    await _upsert_contact_batch(db, items[start:start + CONTACT_UPSERT_BATCH_SIZE], seen_keys, report)
+  return report
+
+# VALIDATE SIRET - Valider un lot de SIRET
+@router.post("/validate-siret", response_model=SiretBatchReport)
+async def validate_siret_batch(batch: SiretBatchRequest):
+  """
+  Valider un lot de SIRET (14 chiffres, clé de Luhn), sans accès à la base.
+  Chaque résultat garde la position du SIRET dans le lot (index).
+  """
+  checks = await run_in_threadpool(validate_sirets, batch.sirets)
+  valid = sum(check.valid for check in checks)
+  return SiretBatchReport(
+    total=len(checks),
+    valid=valid,
+    invalid=len(checks) - valid,
+    results=[
+      SiretValidationResult(index=index, siret=check.siret, valid=check.valid, reason=check.reason)
+      for index, check in enumerate(checks)
+      if not (batch.only_invalid and check.valid)
+    ]
+  )
+
 # READ ALL - Lister tous les fournisseurs
 @router.get("/", response_model=PaginatedResponse[ContactResponse])
-def get_contacts(
+async def get_contacts(
+  request: Request,
+  response: Response,
   page: int = Query(1, ge=1, description="Page's number"),
   page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
   search: Optional[str] = Query(None, description="Rechercher par nom, email ou SIRET"),
@@ -63,52 +141,72 @@ def get_contacts(
   email: Optional[str] = Query(None, description="Filtrer par email (contient)"),
   siret: Optional[str] = Query(None, description="Filtrer par SIRET (exact)"),
   city: Optional[str] = Query(None, description="Filtrer par ville (contient)"),
-  active: Optional[bool] = Query(None, description="Filtrer par status actif/archivé"),
-  db: Session = Depends(get_db)
+  active: Optional[bool] = Query(None, description="Filtrer par status actif/archivé (défaut : actifs)"),
+  include_inactive: bool = Query(False, description="Inclure les contacts archivés"),
+  cursor: Optional[str] = Query(None, description="Curseur de la page suivante (next_cursor)"),
+  count: CountMode = Query(CountMode.EXACT, description="Calcul du total : exact, estimated, cached ou none"),
+  db: AsyncSession = Depends(get_read_db)
 ):
   
   """
-  Lister tous les contacts avec pagination et filtres
+  Lister les contacts avec pagination et filtres.
+  Par défaut, seuls les contacts actifs : active=false pour les archivés,
+  include_inactive=true pour tous.
+  Répond 304 si If-None-Match correspond à l'ETag de la liste.
   """
   # Paramètres de pagination
-  pagination = PaginationParams(page=page, page_size=page_size)
+  pagination = PaginationParams(page=page, page_size=page_size, cursor=cursor)
   
   # Construire la requête de base
-  query = db.query(Contact)
+  query = select(Contact)
+  # Tri par défaut : id (clé du curseur)
+  order_by = [Contact.id]
   
-  # Appliquer les filtres
+  # Appliquer les filtres (« contient » servis par les index trigrammes)
   if search:
-    # Recherche globale (nom OU email OU siret)
-    search_filter = f"%{search}%"
-    query = query.filter(
-      (Contact.name.ilike(search_filter)) |
-      (Contact.email.ilike(search_filter)) |
-      (Contact.siret.ilike(search_filter))
-    )
+    # Recherche globale (nom OU email OU siret), plus pertinents d'abord
+    search_filter, rank = text_search([Contact.name, Contact.email, Contact.siret], search)
+    query = query.where(search_filter)
+    order_by = [rank, Contact.id]
+  
+  if contact_type:
+    query = query.where(Contact.contact_type == contact_type)
   
   if name:
-    query = query.filter(Contact.name.ilike(f"%{name}%"))
+    query = query.where(contains(Contact.name, name))
   
   if email:
-    query = query.filter(Contact.email.ilike(f"%{email}%"))
+    query = query.where(contains(Contact.email, email))
   
   if siret:
-    query = query.filter(Contact.siret == siret)
+    query = query.where(Contact.siret == siret)
   
   if city:
-    query = query.filter(Contact.city.ilike(f"%{city}%"))
+    query = query.where(contains(Contact.city, city))
   
+  # Contacts actifs par défaut (index partiels WHERE active)
+  if active is None and not include_inactive:
+    active = True
   if active is not None:
-    query = query.filter(Contact.active == active)
+    query = query.where(Contact.active == active)
+  
+  # ETag : max(updated_at) et nombre de lignes filtrées, en un agrégat
+  etag, row_count = await list_etag(db, request, query, Contact.updated_at)
+  if is_not_modified(request, etag):
+    return not_modified_response(etag)
+  response.headers.update(cache_headers(etag))
   
-  # Compter le total après filtres
-  total = query.count()
+  # Compter le total après filtres (exact, estimé, en cache ou aucun) ;
+  # le compte exact est déjà connu grâce à l'ETag
+  if count == CountMode.EXACT:
+    total = row_count
+  else:
+    total = await count_total(db, query, count)
   
   # Récupérer les éélments paginés
-  contacts = query\
-    .offset(pagination.skip)\
-    .limit(pagination.limit)\
-    .all()
+  contacts, next_cursor = await fetch_page(
+    db, query, pagination, order_by=order_by, descending=bool(search)
+  )
   
   # Créer la réponse paginée MANNUELLEMENT
   return PaginatedResponse.create(
@@ -116,41 +214,69 @@ def get_contacts(
     total=total,
     page=page,
     page_size=page_size,
+    next_cursor=next_cursor,
+    total_kind=count
   )
 
+# DUPLICATES - Rapport des doublons probables
+@router.get("/duplicates", response_model=ContactDuplicateReport)
+async def get_contact_duplicates(
+  threshold: float = Query(CONTACT_DUPLICATE_THRESHOLD, ge=0.5, le=1, description="Score minimal d'une paire"),
+  contact_type: Optional[ContactType] = Query(None, description="Limiter à un type de contact"),
+  limit: int = Query(100, ge=1, le=1000, description="Paires listées au maximum"),
+  db: AsyncSession = Depends(get_read_db)
+):
+  """
+  Lister les paires de contacts probablement en double, meilleurs scores
+  d'abord. Seuls les contacts partageant une clé de blocage (nom
+  normalisé, SIRET, IBAN, adresse) sont comparés.
+  """
+  return await duplicate_report(db, threshold=threshold, contact_type=contact_type, limit=limit)
+
 # READ ONE - Récupérer un forunisseur par ID
 @router.get("/{contact_id}", response_model=ContactResponse)
-def get_contact(contact_id: int, db: Session = Depends(get_db)):
+async def get_contact(
+  contact_id: int,
+  request: Request,
+  response: Response,
+  db: AsyncSession = Depends(get_read_db)
+):
   """
-  Récupérer un contact spécifique par son ID
+  Récupérer un contact spécifique par son ID.
+  Répond 304 si If-None-Match correspond à l'ETag (date de modification).
   """
-  contact = db.query(Contact).filter(Contact.id == contact_id).first()
+  contact = await db.scalar(select(Contact).where(Contact.id == contact_id))
   if not contact:
     raise ContactNotFoundException(contact_id)
+  
+  etag = detail_etag("contact", contact.id, contact.updated_at)
+  if is_not_modified(request, etag):
+    return not_modified_response(etag)
+  response.headers.update(cache_headers(etag))
   return contact
 
 # UPDATE - Modifier un fournisseur
 @router.put("/{contact_id}", response_model=ContactResponse)
-def update_contact(
+async def update_contact(
   contact_id: int,
   contact_update: ContactUpdate,
-  db: Session = Depends(get_db)
+  db: AsyncSession = Depends(get_async_db)
 ):
   """
   Modifier un contact existant
   """
   try:
-    db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
+    db_contact = await db.scalar(select(Contact).where(Contact.id == contact_id))
     if not db_contact:
       raise ContactNotFoundException(contact_id)
     
     # Vérifier l'unicité de l'email si on le modifie
     update_data = contact_update.model_dump(exclude_unset=True)
     if "email" in update_data and update_data["email"]:
-      existing = db.query(Contact).filter(
-        Contact.email == update_data["email"],
+      existing = await db.scalar(select(Contact).where(
+        func.lower(Contact.email) == update_data["email"].lower(),
         Contact.id != contact_id
-      ).first()
+      ))
       if existing:
         raise DuplicateEmailException(update_data["email"])
     
@@ -158,13 +284,16 @@ def update_contact(
     for key, value in update_data.items():
       setattr(db_contact, key, value)
     
-    db.commit()
-    db.refresh(db_contact)
+    # Nom repris dans les dépenses : invalide leurs ETags
+    if "name" in update_data:
+      await bump_cache_version(db, CONTACTS_VERSION)
+    await db.commit()
+    await db.refresh(db_contact)
     return db_contact
   
   except IntegrityError as e:
-    db.rollback()
-    if "contacts_email_key" in str(e):
+    await db.rollback()
+    if "contacts_email_key" in str(e) or "ix_contacts_email_lower" in str(e):
       raise DuplicateEmailException(update_data.get("email", "unknown"))
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
@@ -173,11 +302,144 @@ def update_contact(
 
 # DELETE - Supprimer un fournisseur
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_contact(contact_id: int, db: Session = Depends(get_db)):
-  db_contact = db.query(Contact).filter(Contact.id == contact_id).first()
-  if not contact_id:
+async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_async_db)):
+  db_contact = await db.scalar(select(Contact).where(Contact.id == contact_id))
+  if not db_contact:
     raise ContactNotFoundException(contact_id)
   
-  db.delete(db_contact)
-  db.commit()
-  return None
\ No newline at end of file
+  await db.delete(db_contact)
+  await db.commit()
+  return None
+
+
+# === Upsert en masse ===
+
+def _reject_upsert_item(report: ContactUpsertReport, index: int, detail: str):
+  """Compte un contact rejeté (détail conservé jusqu'à IMPORT_MAX_ERRORS)"""
+  report.rejected += 1
+  if len(report.errors) < IMPORT_MAX_ERRORS:
+    report.errors.append(ContactUpsertError(index=index, detail=detail))
+  else:
+    report.errors_truncated = True
+
+def _parse_upsert_item(item: Dict[str, Any], siret_checks: dict) -> ContactCreate:
+  """Valide un contact du lot (ValueError si invalide), SIRET sans espaces"""
+  siret = item.get("siret")
+  if siret not in (None, ""):
+    check = siret_checks[str(siret)]
+    if not check.valid:
+      raise ValueError(f"siret: invalid SIRET '{siret}' ({check.reason})")
+    item = {**item, "siret": check.siret}
+  try:
+    return ContactCreate.model_validate(item)
+  except ValidationError as e:
+    raise ValueError("; ".join(
+      f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+    ))
+
+def _upsert_statement(target: str, fields: frozenset):
+  """
+  INSERT ... ON CONFLICT (lower(email) ou id) DO UPDATE des seuls champs fournis,
+  qui renvoie xmax = 0 (vrai si la ligne a été insérée, faux si mise à jour)
+  """
+  statement = insert(Contact)
+  update_columns = {field: statement.excluded[field] for field in fields}
+  if "name" in fields:
+    update_columns["name_key"] = statement.excluded.name_key
+  update_columns["updated_at"] = func.now()
+  return statement.on_conflict_do_update(
+    index_elements=[Contact.id if target == "id" else func.lower(Contact.email)],
+    set_=update_columns
+  ).returning(literal_column("xmax = 0"))
+
+async def _upsert_contact_batch(
+  db: AsyncSession,
+  batch: List[Tuple[int, Dict[str, Any]]],
+  seen_keys: Dict[Tuple[str, str], int],
+  report: ContactUpsertReport
+):
+  """Valide puis écrit un lot de contacts (INSERT ... ON CONFLICT DO UPDATE)"""
+  sirets = list({str(item.get("siret")) for _, item in batch if item.get("siret") not in (None, "")})
+  siret_checks = dict(zip(sirets, validate_sirets(sirets)))
+  
+  keyed = []
+  for index, item in batch:
+    report.total_rows += 1
+    try:
+      contact = _parse_upsert_item(item, siret_checks)
+    except ValueError as e:
+      _reject_upsert_item(report, index, str(e))
+      continue
+    
+    if contact.email:
+      # Doublons du lot repérés sans tenir compte de la casse
+      key = ("email", contact.email.lower())
+    elif contact.siret:
+      key = ("siret", contact.siret)
+    else:
+      _reject_upsert_item(report, index, "email or siret is required to upsert a contact")
+      continue
+    if key in seen_keys:
+      _reject_upsert_item(report, index, f"Duplicate {key[0]} '{key[1]}' (already at index {seen_keys[key]})")
+      continue
+    seen_keys[key] = index
+    keyed.append((index, key, contact))
+  
+  if not keyed:
+    return
+  
+  # Contacts sans email : mise à jour du contact existant au même SIRET
+  # (le plus ancien en cas de doublon), une requête pour le lot
+  siret_ids = {}
+  by_siret = [key[1] for _, key, _ in keyed if key[0] == "siret"]
+  if by_siret:
+    rows = await db.execute(
+      select(Contact.siret, Contact.id).where(Contact.siret.in_(by_siret)).order_by(Contact.id.desc())
+    )
+    siret_ids = {siret: contact_id for siret, contact_id in rows}
+  
+  # Un INSERT par conflit visé (email ou id) et par champs fournis :
+  # seuls ces champs sont mis à jour, les défauts ne s'appliquent qu'à la création
+  groups = defaultdict(list)
+  for index, (kind, value), contact in keyed:
+    values = contact.model_dump()
+    values["name_key"] = contact_name_key(contact.name)
+    target = "email"
+    if kind == "siret" and value in siret_ids:
+      values["id"] = siret_ids[value]
+      target = "id"
+    groups[(target, frozenset(contact.model_fields_set))].append((index, values))
+  
+  # Noms mis à jour : repris dans les dépenses, invalide leurs ETags
+  renames = any("name" in fields for _, fields in groups)
+  try:
+    results = []
+    for (target, fields), members in groups.items():
+      # executemany : SQL compilé une fois, envoyé en INSERT multi-lignes
+      results += (await db.execute(
+        _upsert_statement(target, fields), [values for _, values in members]
+      )).scalars().all()
+    if renames:
+      await bump_cache_version(db, CONTACTS_VERSION)
+    await db.commit()
+  except IntegrityError:
+    await db.rollback()
+    # Un contact en conflit (email déjà pris par un autre contact...) :
+    # reprise ligne par ligne, chacune dans un SAVEPOINT, pour ne
+    # rejeter que les contacts fautifs
+    results = []
+    for (target, fields), members in groups.items():
+      statement = _upsert_statement(target, fields)
+      for index, values in members:
+        try:
+          async with db.begin_nested():
+            results.append((await db.execute(statement, values)).scalar_one())
+        except IntegrityError as e:
+          _reject_upsert_item(report, index, f"Database integrity error: {e.orig}")
+    if renames:
+      await bump_cache_version(db, CONTACTS_VERSION)
+    await db.commit()
+  
+  created = sum(1 for inserted in results if inserted)
+  report.created += created
+  report.updated += len(results) - created
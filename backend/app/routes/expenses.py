@@ -1,35 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Integer, cast, extract, func, insert, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from datetime import date, datetime
+from decimal import Decimal
+import csv
+import io
+import json
 
-from app.database import get_db
+from app.cache import CONTACTS_VERSION, USERS_VERSION, category_cache
+from app.config import IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS, EXPORT_BATCH_SIZE
+from app.database import get_async_db, get_read_db, open_read_session, reads_from_primary
+from app.http_cache import cache_headers, detail_etag, is_not_modified, list_etag, not_modified_response
+from app.pagination import fetch_page, count_total
+from app.validators import SiretCheck, validate_sirets
 from app.models.expense import Expense
 from app.models.user import User
 from app.models.category import Category
 from app.models.contact import Contact
+from app.models.cache_version import CacheVersion
 from app.schemas import (
     ExpenseCreate,
     ExpenseUpdate,
     ExpenseResponse,
     ExpenseDetailResponse,
+    ExpenseImportError,
+    ExpenseImportReport,
+    ExpenseSummary,
+    ExpenseBatchCreate,
     PaginationParams,
     PaginatedResponse
 )
-from app.enums import ExpenseStatus
+from app.enums import ExpenseStatus, CountMode, ExportFormat, ExpenseGroupBy
 
 router = APIRouter(
     prefix="/api/expenses",
     tags=["Expenses"]
 )
 
+# Filtres communs à la liste et à l'export
+def expense_filters(
+  user_id: Optional[int] = Query(None, description="Filtrer par utilisateur"),
+  category_id: Optional[int] = Query(None, description="Filtrer par catégorie"),
+  contact_id: Optional[int] = Query(None, description="Filtrer par fournisseur"),
+  status: Optional[ExpenseStatus] = Query(None, description="Filtrer par statut"),
+  min_amount: Optional[float] = Query(None, description="Montant minimum"),
+  max_amount: Optional[float] = Query(None, description="Montant maximum"),
+  start_date: Optional[date] = Query(None, description="Date de début"),
+  end_date: Optional[date] = Query(None, description="Date de fin")
+) -> list:
+  """
+  Dépendance : traduit les paramètres de filtre en conditions SQL,
+  à passer à .where(*filters) sur toute requête portant sur Expense.
+  """
+  filters = []
+  
+  if user_id:
+    filters.append(Expense.user_id == user_id)
+  
+  if category_id:
+    filters.append(Expense.category_id == category_id)
+  
+  if contact_id:
+    filters.append(Expense.contact_id == contact_id)
+  
+  if status:
+    filters.append(Expense.status == status)
+  
+  if min_amount:
+    filters.append(Expense.amount >= min_amount)
+    
+  if max_amount:
+    filters.append(Expense.amount <= max_amount)
+  
+  if start_date:
+    filters.append(Expense.expense_date >= start_date)
+  
+  if end_date:
+    filters.append(Expense.expense_date <= end_date)
+  
+  return filters
+
 # CREATE - Créer une dépense
 @router.post("/", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
-def create_expense(
+async def create_expense(
   expense: ExpenseCreate,
   user_id: int = Query(..., description="ID de l'utilisateur qui soumet la dépense"),
-  db: Session = Depends(get_db)
+  db: AsyncSession = Depends(get_async_db)
 ):
   """
   Crée une nouvelle dépense.
@@ -38,30 +99,13 @@ def create_expense(
   """
   
   try:
-    #Vérif que l'user existe
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-      raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"User with id {user_id} not found"
-      )
-    
-    # Vérifier que la cat. existe
-    category = db.query(Category).filter(Category.id == expense.category_id).first()
-    if not category:
-      raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Category with id {expense.category_id} not found"
-      )
-    
-    # Vérifier que le fournisseur existe si fourni
-    if expense.contact_id:
-      contact = db.query(Contact).filter(Contact.id == expense.contact_id).first()
-      if not contact:
-        raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Contact with id {expense.contact_id} not found"
-      )
+    # Vérifier l'utilisateur, la catégorie et le fournisseur (si fourni)
+    await _check_references(
+      db,
+      user_ids={user_id},
+      category_ids={expense.category_id},
+      contact_ids={expense.contact_id} if expense.contact_id else set()
+    )
     
     # Créer la dépense
     expense_data = expense.model_dump()
@@ -70,166 +114,309 @@ def create_expense(
     
     db_expense = Expense(**expense_data)
     db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
+    await db.commit()
+    await db.refresh(db_expense)
     return db_expense
   
   except IntegrityError as e:
-    db.rollback()
+    await db.rollback()
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail=f"Database integrity error: {str(e)}"
     )
 
+# CREATE BATCH - Créer plusieurs dépenses en une transaction
+@router.post("/batch", response_model=List[ExpenseResponse], status_code=status.HTTP_201_CREATED)
+async def create_expenses_batch(
+  batch: ExpenseBatchCreate,
+  user_id: int = Query(..., description="ID de l'utilisateur qui soumet les dépenses"),
+  db: AsyncSession = Depends(get_async_db)
+):
+  """
+  Crée plusieurs dépenses en une seule transaction (tout ou rien).
+  Les références sont vérifiées en une requête pour tout le lot,
+  puis les dépenses sont insérées en un seul INSERT ... RETURNING.
+  """
+  try:
+    await _check_references(
+      db,
+      user_ids={user_id},
+      category_ids={expense.category_id for expense in batch.expenses},
+      contact_ids={expense.contact_id for expense in batch.expenses if expense.contact_id}
+    )
+    
+    rows = []
+    for expense in batch.expenses:
+      expense_data = expense.model_dump()
+      expense_data["user_id"] = user_id
+      expense_data["status"] = ExpenseStatus.PENDING
+      rows.append(expense_data)
+    
+    expenses = (await db.scalars(
+      insert(Expense).returning(Expense, sort_by_parameter_order=True), rows
+    )).all()
+    await db.commit()
+    return expenses
+  
+  except IntegrityError as e:
+    await db.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Database integrity error: {str(e)}"
+    )
+
+# IMPORT - Importer des dépenses depuis un fichier CSV
+@router.post("/import", response_model=ExpenseImportReport)
+async def import_expenses(
+  file: UploadFile = File(..., description="Fichier CSV UTF-8 (séparateur ; ou ,)"),
+  user_id: int = Query(..., description="ID de l'utilisateur qui soumet les dépenses"),
+  db: AsyncSession = Depends(get_async_db)
+):
+  """
+  Importe des dépenses en masse depuis un fichier CSV.
+  Colonnes : amount, description, expense_date (AAAA-MM-JJ ou JJ/MM/AAAA),
+  category_code (code PCG), contact_siret (optionnel).
+  
+  Le fichier est lu en flux, par lots de IMPORT_BATCH_SIZE lignes : chaque lot
+  est validé avec les règles de ExpenseCreate, ses codes PCG et SIRET sont
+  résolus en une requête chacun, puis il est inséré en un seul INSERT
+  multi-lignes. Les lignes invalides sont rapportées sans interrompre l'import.
+  """
+  #Vérif que l'user existe
+  user = await db.scalar(select(User).where(User.id == user_id))
+  if not user:
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND,
+      detail=f"User with id {user_id} not found"
+    )
+  
+  # Lecture en flux du fichier (déjà mis en tampon sur disque par Starlette)
+  text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+  try:
+    header = await run_in_threadpool(text.readline)
+  except UnicodeDecodeError:
+    raise HTTPException(
+      status_code=status.HTTP_400_BAD_REQUEST,
+      detail="CSV file must be UTF-8 encoded"
+    )
+  delimiter = ";" if header.count(";") >= header.count(",") else ","
+  fieldnames = [name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter), [])]
+  
+  missing = [name for name in ("amount", "description", "expense_date", "category_code") if name not in fieldnames]
+  if missing:
+    raise HTTPException(
+      status_code=status.HTTP_400_BAD_REQUEST,
+      detail=f"Missing CSV columns: {', '.join(missing)}"
+    )
+  
+  reader = csv.DictReader(text, fieldnames=fieldnames, delimiter=delimiter)
+  report = ExpenseImportReport()
+  while True:
+    try:
+      batch = await run_in_threadpool(_read_csv_batch, reader, IMPORT_BATCH_SIZE)
+    except (UnicodeDecodeError, csv.Error) as e:
+      # Fichier illisible à partir d'ici : on garde les lots déjà importés
+      _reject_import_row(report, reader.line_num + 2, f"Unreadable CSV, import stopped: {e}")
+      break
+    if not batch:
+      break
+    await _import_expense_batch(db, batch, user_id, report)
+  
+  return report
+
 # READ ALL - Lister toutes les dépenses
 @router.get("/", response_model=PaginatedResponse[ExpenseDetailResponse])
-def get_expenses(
+async def get_expenses(
+  request: Request,
+  response: Response,
   page: int = Query(1, ge=1, description="Page number"),
   page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
-  user_id: Optional[int] = Query(None, description="Filtrer par utilisateur"),
-  category_id: Optional[int] = Query(None, description="Filtrer par catégorie"),
-  contact_id: Optional[int] = Query(None, description="Filtrer par fournisseur"),
-  status: Optional[ExpenseStatus] = Query(None, description="Filtrer par statut"),
-  min_amount: Optional[float] = Query(None, description="Montant minimum"),
-  max_amount: Optional[float] = Query(None, description="Montant maximum"),
-  start_date: Optional[date] = Query(None, description="Date de début"),
-  end_date: Optional[date] = Query(None, description="Date de fin"),
-  db: Session = Depends(get_db)
+  filters: list = Depends(expense_filters),
+  cursor: Optional[str] = Query(None, description="Curseur de la page suivante (next_cursor)"),
+  count: CountMode = Query(CountMode.EXACT, description="Calcul du total : exact, estimated, cached ou none"),
+  db: AsyncSession = Depends(get_read_db)
 ):
   """
   Liste toutes les dépenses avec filtres et pagination.
   Retourne les informations détaillées (avec noms des objets liés).
+  Avec `cursor`, la pagination se fait par clé (expense_date, id) :
+  le coût d'une page ne dépend plus de sa profondeur.
+  Répond 304 si If-None-Match correspond à l'ETag de la liste.
   """
   
   # Paramètres de pagination
-  pagination = PaginationParams(page=page, page_size=page_size)
+  pagination = PaginationParams(page=page, page_size=page_size, cursor=cursor)
   
-  # Construire requete de base
-  query = db.query(Expense).options(
-    joinedload(Expense.user),
-    joinedload(Expense.category),
-    joinedload(Expense.contact)
+  # ETag : max(updated_at) et nombre de lignes filtrées, en un agrégat
+  # sans les jointures (elles ne changent pas le nombre de lignes), plus
+  # les versions des tables dont la liste reprend les noms
+  base_query = select(Expense).where(*filters)
+  etag, row_count = await list_etag(db, request, base_query, Expense.updated_at, related=[RELATED_VERSIONS])
+  if is_not_modified(request, etag):
+    return not_modified_response(etag)
+  response.headers.update(cache_headers(etag))
+  
+  # Compter le total après filtres (exact, estimé, en cache ou aucun) ;
+  # le compte exact est déjà connu grâce à l'ETag
+  if count == CountMode.EXACT:
+    total = row_count
+  else:
+    total = await count_total(db, base_query, count)
+  
+  # Récupérer les éléments paginés (id départage les dates identiques) :
+  # colonnes de ExpenseDetailResponse en une requête, sans objets ORM
+  enriched_expenses, next_cursor = await fetch_page(
+    db,
+    expense_detail_query().where(*filters),
+    pagination,
+    order_by=[Expense.expense_date, Expense.id],
+    descending=True
   )
   
-  # Appliquer les filtres
-  if user_id:
-    query = query.filter(Expense.user_id == user_id)
+  # Créer la réponse paginée
+  return PaginatedResponse.create(
+    items=enriched_expenses,
+    total=total,
+    page=page,
+    page_size=page_size,
+    next_cursor=next_cursor,
+    total_kind=count
+  )
+
+# EXPORT - Exporter les dépenses filtrées (déclaré avant /{expense_id})
+@router.get("/export")
+async def export_expenses(
+  request: Request,
+  export_format: ExportFormat = Query(ExportFormat.CSV, alias="format", description="csv ou ndjson"),
+  filters: list = Depends(expense_filters)
+):
+  """
+  Exporte toutes les dépenses correspondant aux filtres de la liste.
   
-  if category_id:
-    query = query.filter(Expense.category_id == category_id)
+  Les lignes sont lues par un curseur côté serveur (yield_per) et envoyées
+  au fil de l'eau, par morceaux de EXPORT_BATCH_SIZE lignes : la mémoire
+  reste constante quel que soit le volume et le téléchargement démarre
+  immédiatement. Colonnes compatibles avec POST /api/expenses/import.
+  """
+  query = (
+    select(*EXPORT_COLUMNS)
+    .select_from(Expense)
+    .outerjoin(Expense.user)
+    .outerjoin(Expense.category)
+    .outerjoin(Expense.contact)
+    .where(*filters)
+    .order_by(Expense.expense_date.desc(), Expense.id.desc())
+    .execution_options(yield_per=EXPORT_BATCH_SIZE)
+  )
   
-  if contact_id:
-    query = query.filter(Expense.contact_id == contact_id)
+  if export_format == ExportFormat.NDJSON:
+    media_type = "application/x-ndjson"
+  else:
+    media_type = "text/csv"
   
-  if status:
-    query = query.filter(Expense.status == status)
+  return StreamingResponse(
+    _stream_expenses(query, export_format, primary=reads_from_primary(request)),
+    media_type=media_type,
+    headers={"Content-Disposition": f'attachment; filename="expenses.{export_format.value}"'}
+  )
+
+# SUMMARY - Totaux des dépenses regroupées (calculés par PostgreSQL)
+@router.get("/summary", response_model=ExpenseSummary, response_model_exclude_unset=True)
+async def get_expenses_summary(
+  group_by: List[ExpenseGroupBy] = Query([], description="Axes de regroupement (répétable) : category, contact, user, status, month, year"),
+  filters: list = Depends(expense_filters),
+  db: AsyncSession = Depends(get_read_db)
+):
+  """
+  Somme et nombre des dépenses filtrées, par axe de regroupement.
+  Exemple : ?group_by=category&group_by=month&start_date=2024-01-01&end_date=2024-12-31
   
-  if min_amount:
-    query = query.filter(Expense.amount >= min_amount)
-    
-  if max_amount:
-    query = query.filter(Expense.amount <= max_amount)
+  Tout est agrégé en SQL (SUM / COUNT / GROUP BY) en une seule requête,
+  avec les mêmes filtres que la liste ; sans group_by, renvoie le total.
+  """
+  # Colonnes à sélectionner et à grouper, sans doublon (month inclut year)
+  columns = {}
+  joins = []
+  for axis in group_by:
+    for label, expression, join in _SUMMARY_AXES[axis]:
+      columns.setdefault(label, expression)
+      if join is not None and join not in joins:
+        joins.append(join)
   
-  if start_date:
-    query = query.filter(Expense.expense_date >= start_date)
+  group_columns = [expression.label(label) for label, expression in columns.items()]
+  query = select(
+    *group_columns,
+    func.coalesce(func.sum(Expense.amount), 0).label("total_amount"),
+    func.count(Expense.id).label("expense_count")
+  ).select_from(Expense)
+  for join in joins:
+    query = query.outerjoin(getattr(Expense, join))
   
-  if end_date:
-    query = query.filter(Expense.expense_date <= end_date)
+  query = query.where(*filters)
+  if group_columns:
+    query = query.group_by(*columns.values()).order_by(*columns.values())
   
-  # Compter le total après filtres
-  total = query.count()
+  rows = [dict(row._mapping) for row in await db.execute(query)]
   
-  # Récupérer les éléments paginés
-  expenses = query\
-    .order_by(Expense.expense_date.desc())\
-    .offset(pagination.skip)\
-    .limit(pagination.limit)\
-    .all()
-    
-  # Enrichir les données avec les noms
-  enriched_expenses = []
-  for expense in expenses:
-    expense_dict = {
-      "id": expense.id,
-      "amount": expense.amount,
-      "description": expense.description,
-      "expense_date": expense.expense_date,
-      "status": expense.status,
-      "user_id": expense.user_id,
-      "category_id": expense.category_id,
-      "contact_id": expense.contact_id,
-      "created_at": expense.created_at,
-      "updated_at": expense.updated_at,
-      # Informations enrichies
-      "user_email": expense.user.email if expense.user else None,
-      "user_name": expense.user.full_name if expense.user else None,
-      "category_name": expense.category.name if expense.category else None,
-      "category_code": expense.category.code if expense.category else None,
-      "contact_name": expense.contact.name if expense.contact else None
-    }
-    enriched_expenses.append(expense_dict)
-    
-    # Créer la réponse paginée
-  return PaginatedResponse.create(
-    items=enriched_expenses,
-    total=total,
-    page=page,
-    page_size=page_size
-  )
+  return {
+    "group_by": group_by,
+    "rows": rows,
+    "total_amount": sum((row["total_amount"] for row in rows), Decimal("0")),
+    "expense_count": sum(row["expense_count"] for row in rows)
+  }
 
 # READ ONE - Récupérer une dépense par ID
 @router.get("/{expense_id}", response_model=ExpenseDetailResponse)
-def get_expense(expense_id: int, db: Session = Depends(get_db)):
+async def get_expense(
+  expense_id: int,
+  request: Request,
+  response: Response,
+  db: AsyncSession = Depends(get_read_db)
+):
   """
-  Récupère une dépense avec totues les informations détaillées
+  Récupère une dépense avec totues les informations détaillées.
+  Répond 304 si If-None-Match correspond à l'ETag (dates de modification
+  de la dépense et des utilisateur, catégorie et contact liés).
   """
-  expense = db.query(Expense).options(
-    joinedload(Expense.user),
-    joinedload(Expense.category),
-    joinedload(Expense.contact)
-  ).filter(Expense.id == expense_id).first()
+  expense = (await db.execute(
+    expense_detail_query()
+    .add_columns(
+      User.updated_at.label("user_updated_at"),
+      Category.updated_at.label("category_updated_at"),
+      Contact.updated_at.label("contact_updated_at")
+    )
+    .where(Expense.id == expense_id)
+  )).first()
   
   if not expense:
     raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Expense with id {expense_id} not found"
         )
-    
-  # Enrichir les données
-  expense_dict = {
-    "id": expense.id,
-    "amount": expense.amount,
-    "description": expense.description,
-    "expense_date": expense.expense_date,
-    "status": expense.status,
-    "user_id": expense.user_id,
-    "category_id": expense.category_id,
-    "contact_id": expense.contact_id,
-    "created_at": expense.created_at,
-    "updated_at": expense.updated_at,
-    # Informations enrichies
-    "user_email": expense.user.email if expense.user else None,
-    "user_name": expense.user.full_name if expense.user else None,
-    "category_name": expense.category.name if expense.category else None,
-    "category_code": expense.category.code if expense.category else None,
-    "contact_name": expense.contact.name if expense.contact else None
-  }
   
-  return expense_dict
+  etag = detail_etag(
+    "expense", expense.id, expense.updated_at,
+    expense.user_updated_at, expense.category_updated_at, expense.contact_updated_at
+  )
+  if is_not_modified(request, etag):
+    return not_modified_response(etag)
+  response.headers.update(cache_headers(etag))
+  
+  return expense._asdict()
 
 # UPDATE - Modifier une dépense
 @router.put("/{expense_id}", response_model=ExpenseResponse)
-def update_expense(
+async def update_expense(
   expense_id: int,
   expense_update: ExpenseUpdate,
-  db: Session = Depends(get_db)
+  db: AsyncSession = Depends(get_async_db)
 ):
   """
   Modifie une dépense existante.
   Seules les dépenses en statut PENDING peuvent être modifiées
   """
   try:
-    db_expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    db_expense = await db.scalar(select(Expense).where(Expense.id == expense_id))
     if not db_expense:
       raise HTTPException(
           status_code=status.HTTP_404_NOT_FOUND,
@@ -246,35 +433,332 @@ def update_expense(
     # Récupérer les données à mettre à jour
     update_data = expense_update.model_dump(exclude_unset=True)
     
-    # Vérifier que la cat. existe
-    if "category_id" in update_data:
-      category = db.query(Category).filter(Category.id == update_data["category_id"]).first()
-      if not category:
-        raise HTTPException(
-          status_code=status.HTTP_404_NOT_FOUND,
-          detail=f"Category with id {update_data['category_id']} not found"
-        )
-    
-    # Vérifier que le fournisseur existe si fourni
-    if "contact_id" in update_data and update_data["contact_id"]:
-      contact = db.query(Contact).filter(Contact.id == update_data["contact_id"]).first()
-      if not contact:
-        raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Contact with id {update_data['contact_id']} not found"
-      )
+    # Vérifier la catégorie et le fournisseur s'ils changent
+    await _check_references(
+      db,
+      category_ids={update_data["category_id"]} if update_data.get("category_id") else set(),
+      contact_ids={update_data["contact_id"]} if update_data.get("contact_id") else set()
+    )
     
     # Appliquer les modifications
     for key, value in update_data.items():
       setattr(db_expense, key, value)
     
-    db.commit()
-    db.refresh(db_expense)
+    await db.commit()
+    await db.refresh(db_expense)
     return db_expense
   
   except IntegrityError as e:
-    db.rollback()
+    await db.rollback()
     raise HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail=f"Database integrity error: {str(e)}"
-    )
\ No newline at end of file
+    )
+
+# === Lecture détaillée (projection) ===
+
+# Colonnes de ExpenseDetailResponse, noms des objets liés compris
+EXPENSE_DETAIL_COLUMNS = [
+  Expense.id,
+  Expense.amount,
+  Expense.description,
+  Expense.expense_date,
+  Expense.status,
+  Expense.user_id,
+  Expense.category_id,
+  Expense.contact_id,
+  Expense.created_at,
+  Expense.updated_at,
+  User.email.label("user_email"),
+  # Même format que User.full_name
+  func.concat(User.first_name, " ", User.last_name).label("user_name"),
+  Category.name.label("category_name"),
+  Category.code.label("category_code"),
+  Contact.name.label("contact_name"),
+]
+
+# Versions des données dont la liste reprend les noms (cache_versions,
+# incrémentées à chaque modification) : une lecture par clé primaire
+RELATED_VERSIONS = (
+  select(func.coalesce(func.sum(CacheVersion.version), 0))
+  .where(CacheVersion.name.in_([USERS_VERSION, category_cache.name, CONTACTS_VERSION]))
+  .scalar_subquery()
+)
+
+def expense_detail_query():
+  """
+  Requête des dépenses détaillées : une seule instruction SQL avec les
+  jointures explicites, lignes renvoyées telles quelles (pas d'objets
+  ORM à construire ni de dict à recopier champ par champ).
+  """
+  return (
+    select(*EXPENSE_DETAIL_COLUMNS)
+    .select_from(Expense)
+    .outerjoin(Expense.user)
+    .outerjoin(Expense.category)
+    .outerjoin(Expense.contact)
+  )
+
+# === Vérification des références ===
+
+async def _check_references(
+  db: AsyncSession,
+  user_ids: Set[int] = frozenset(),
+  category_ids: Set[int] = frozenset(),
+  contact_ids: Set[int] = frozenset()
+):
+  """
+  Vérifie que les utilisateurs, catégories et fournisseurs référencés existent.
+  
+  Catégories : cache mémoire. Utilisateurs et fournisseurs : une seule
+  requête (UNION ALL) quel que soit le nombre d'ids. Lève la même 404 que
+  les contrôles un par un, pour la première référence manquante.
+  """
+  lookups = []
+  if user_ids:
+    lookups.append(select(literal("user"), User.id).where(User.id.in_(user_ids)))
+  if contact_ids:
+    lookups.append(select(literal("contact"), Contact.id).where(Contact.id.in_(contact_ids)))
+  
+  found = set()
+  if lookups:
+    query = lookups[0] if len(lookups) == 1 else union_all(*lookups)
+    found = {(kind, row_id) for kind, row_id in await db.execute(query)}
+  
+  for user_id in sorted(user_ids):
+    if ("user", user_id) not in found:
+      raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"User with id {user_id} not found"
+      )
+  
+  for category_id in sorted(category_ids):
+    if not await category_cache.get(db, category_id):
+      raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Category with id {category_id} not found"
+      )
+  
+  for contact_id in sorted(contact_ids):
+    if ("contact", contact_id) not in found:
+      raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Contact with id {contact_id} not found"
+      )
+
+# === Axes du récapitulatif ===
+
+# Axe -> [(colonne de sortie, expression SQL, relation à joindre ou None)]
+_SUMMARY_AXES = {
+  ExpenseGroupBy.CATEGORY: [
+    ("category_id", Expense.category_id, None),
+    ("category_code", Category.code, "category"),
+    ("category_name", Category.name, "category"),
+  ],
+  ExpenseGroupBy.CONTACT: [
+    ("contact_id", Expense.contact_id, None),
+    ("contact_name", Contact.name, "contact"),
+  ],
+  ExpenseGroupBy.USER: [
+    ("user_id", Expense.user_id, None),
+    ("user_name", func.concat(User.first_name, " ", User.last_name), "user"),
+  ],
+  ExpenseGroupBy.STATUS: [
+    ("status", Expense.status, None),
+  ],
+  ExpenseGroupBy.YEAR: [
+    ("year", cast(extract("year", Expense.expense_date), Integer), None),
+  ],
+  ExpenseGroupBy.MONTH: [
+    ("year", cast(extract("year", Expense.expense_date), Integer), None),
+    ("month", cast(extract("month", Expense.expense_date), Integer), None),
+  ],
+}
+
+# === Helpers d'export ===
+
+# Colonnes exportées (projection : pas d'objets ORM à construire par ligne)
+EXPORT_COLUMNS = [
+  Expense.id,
+  Expense.expense_date,
+  Expense.amount,
+  Expense.description,
+  Expense.status,
+  Expense.user_id,
+  User.email.label("user_email"),
+  Expense.category_id,
+  Category.code.label("category_code"),
+  Category.name.label("category_name"),
+  Expense.contact_id,
+  Contact.siret.label("contact_siret"),
+  Contact.name.label("contact_name"),
+  Expense.created_at,
+]
+
+def _export_value(value):
+  """Valeur sérialisable : montants en texte (pas de flottants), dates ISO"""
+  if isinstance(value, (date, datetime)):
+    return value.isoformat()
+  if isinstance(value, Decimal):
+    return str(value)
+  if isinstance(value, ExpenseStatus):
+    return value.value
+  return value
+
+async def _stream_expenses(query, export_format: ExportFormat, primary: bool = False) -> AsyncIterator[str]:
+  """
+  Générateur de l'export, un morceau par lot de lignes.
+  Utilise sa propre session en lecture (réplique si configurée) : celle
+  de la requête serait refermée avant la fin de l'envoi.
+  """
+  fieldnames = [column.key for column in EXPORT_COLUMNS]
+  buffer = io.StringIO()
+  writer = csv.writer(buffer, delimiter=";")
+  
+  if export_format == ExportFormat.CSV:
+    writer.writerow(fieldnames)
+  
+  async with await open_read_session(primary) as db:
+    result = await db.stream(query)
+    async for rows in result.partitions():
+      for row in rows:
+        values = [_export_value(value) for value in row]
+        if export_format == ExportFormat.NDJSON:
+          buffer.write(json.dumps(dict(zip(fieldnames, values)), ensure_ascii=False))
+          buffer.write("\n")
+        else:
+          writer.writerow(values)
+      
+      yield buffer.getvalue()
+      buffer.seek(0)
+      buffer.truncate()
+  
+  # En-tête seul si aucune ligne
+  if buffer.tell():
+    yield buffer.getvalue()
+
+# === Helpers d'import CSV ===
+
+def _read_csv_batch(reader: csv.DictReader, size: int) -> List[Tuple[int, dict]]:
+  """Lit jusqu'à `size` lignes (numéro de ligne, valeurs) depuis le CSV"""
+  batch = []
+  for row in reader:
+    # +1 : l'en-tête est lu avant le DictReader
+    batch.append((reader.line_num + 1, row))
+    if len(batch) >= size:
+      break
+  return batch
+
+async def _lookup_ids(db: AsyncSession, key_column, keys: Set[str]) -> Dict[str, int]:
+  """Résout un ensemble de clés (code PCG, SIRET...) en ids, en une requête"""
+  if not keys:
+    return {}
+  id_column = key_column.class_.id
+  rows = await db.execute(
+    select(key_column, id_column).where(key_column.in_(keys)).order_by(id_column.desc())
+  )
+  # Tri décroissant : en cas de doublon (SIRET), le plus ancien contact l'emporte
+  return {key: row_id for key, row_id in rows}
+
+def _parse_import_date(value: str):
+  """Accepte JJ/MM/AAAA en plus du format ISO validé par ExpenseCreate"""
+  value = value.strip()
+  if "/" in value:
+    try:
+      return datetime.strptime(value, "%d/%m/%Y").date()
+    except ValueError:
+      raise ValueError(f"expense_date: invalid date '{value}'")
+  return value
+
+def _parse_import_row(
+  row: dict,
+  categories: Dict[str, int],
+  contacts: Dict[str, int],
+  siret_checks: Dict[str, SiretCheck]
+) -> ExpenseCreate:
+  """Convertit une ligne CSV en ExpenseCreate (ValueError si invalide)"""
+  code = (row.get("category_code") or "").strip()
+  if code not in categories:
+    raise ValueError(f"Category with code '{code}' not found")
+  
+  data = {
+    # Montants « à la française » : 1 234,50
+    "amount": (row.get("amount") or "").strip().replace("\u00a0", "").replace(" ", "").replace(",", "."),
+    "description": (row.get("description") or "").strip(),
+    "expense_date": _parse_import_date(row.get("expense_date") or ""),
+    "category_id": categories[code],
+  }
+  
+  siret = (row.get("contact_siret") or "").strip()
+  if siret:
+    check = siret_checks[siret]
+    if not check.valid:
+      raise ValueError(f"Invalid SIRET '{siret}' ({check.reason})")
+    if check.siret not in contacts:
+      raise ValueError(f"Contact with SIRET '{siret}' not found")
+    data["contact_id"] = contacts[check.siret]
+  
+  return ExpenseCreate(**data)
+
+def _reject_import_row(report: ExpenseImportReport, line: int, detail: str):
+  """Compte une ligne rejetée (détail conservé jusqu'à IMPORT_MAX_ERRORS)"""
+  report.rejected += 1
+  if len(report.errors) < IMPORT_MAX_ERRORS:
+    report.errors.append(ExpenseImportError(line=line, detail=detail))
+  else:
+    report.errors_truncated = True
+
+async def _import_expense_batch(
+  db: AsyncSession,
+  batch: List[Tuple[int, dict]],
+  user_id: int,
+  report: ExpenseImportReport
+):
+  """Valide, résout les références et insère un lot de lignes CSV"""
+  # Catégories servies par le cache, une requête par autre table référencée
+  categories = {}
+  for code in {(row.get("category_code") or "").strip() for _, row in batch} - {""}:
+    category = await category_cache.get_by_code(db, code)
+    if category:
+      categories[code] = category.id
+  # SIRET du lot validés d'un coup (espaces ignorés) : seuls les valides
+  # sont recherchés en base
+  sirets = list({(row.get("contact_siret") or "").strip() for _, row in batch} - {""})
+  siret_checks = dict(zip(sirets, validate_sirets(sirets)))
+  contacts = await _lookup_ids(
+    db, Contact.siret, {check.siret for check in siret_checks.values() if check.valid}
+  )
+  
+  rows_to_insert = []
+  lines = []
+  for line, row in batch:
+    report.total_rows += 1
+    try:
+      expense = _parse_import_row(row, categories, contacts, siret_checks)
+    except ValidationError as e:
+      _reject_import_row(report, line, "; ".join(
+        f"{error['loc'][0]}: {error['msg']}" for error in e.errors()
+      ))
+      continue
+    except ValueError as e:
+      _reject_import_row(report, line, str(e))
+      continue
+    
+    expense_data = expense.model_dump()
+    expense_data["user_id"] = user_id
+    expense_data["status"] = ExpenseStatus.PENDING
+    rows_to_insert.append(expense_data)
+    lines.append(line)
+  
+  if not rows_to_insert:
+    return
+  
+  # Un seul INSERT multi-lignes par lot, validé lot par lot
+  try:
+    await db.execute(insert(Expense).values(rows_to_insert))
+    await db.commit()
+    report.imported += len(rows_to_insert)
+  except IntegrityError as e:
+    await db.rollback()
+    for line in lines:
+      _reject_import_row(report, line, f"Database integrity error: {e.orig}")
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import Optional
 
-from app.database import get_db
+from app.cache import USERS_VERSION, bump_cache_version
+from app.database import get_async_db, get_read_db
+from app.pagination import fetch_page, count_total
+from app.search import contains, text_search
 from app.models.user import User
 from app.schemas import (
     UserCreate,
@@ -12,19 +16,22 @@ from app.schemas import (
     PaginationParams,
     PaginatedResponse
 )
-from app.utils import hash_password
-from app.enums import UserRole
+from app.utils import hash_password_async
+from app.enums import UserRole, CountMode
 
 router = APIRouter(
     prefix="/api/users",
     tags=["Users"]
 )
 
+# Champs repris dans les réponses des dépenses (user_name, user_email)
+USER_DISPLAY_FIELDS = {"first_name", "last_name", "email"}
+
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
   try:
     # Check si l'email existe déjà
-    existing_user = db.query(User).filter(User.email == user.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user.email))
     if existing_user:
       raise HTTPException(
         status_code=status.HTTP_409_CONFLICT,
@@ -34,18 +41,18 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     # Créer le dictionnaire avec les données de l'utilisateur
     user_data = user.model_dump(exclude={"password"})
     
-    # Hasher le mot de passe
-    user_data["hashed_password"] = hash_password(user.password)
+    # Hasher le mot de passe (pool bcrypt dédié, hors de la boucle asyncio)
+    user_data["hashed_password"] = await hash_password_async(user.password)
     
     # Créer l'utilisateur
     db_user = User(**user_data)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
   
   except IntegrityError as e:
-    db.rollback()
+    await db.rollback()
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail=f"Database integrity error: {str(e)}"
@@ -53,61 +60,67 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 # READ ALL - Lister tous les utilisateurs
 @router.get("/", response_model=PaginatedResponse[UserResponse])
-def get_users(
+async def get_users(
   page: int = Query(1, ge=1, description="Page's number"),
   page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
   search: Optional[str] = Query(None, description="Rechercher par nom, prénom ou email"),
   email: Optional[str] = Query(None, description="Filtrer par email (contient)"),
   role: Optional[UserRole] = Query(None, description="Filtrer par rôle"),
-  is_active: Optional[bool] = Query(None, description="Fitlrer par status actif"),
-  db: Session = Depends(get_db)
+  is_active: Optional[bool] = Query(None, description="Fitlrer par status actif (défaut : actifs)"),
+  include_inactive: bool = Query(False, description="Inclure les utilisateurs désactivés"),
+  cursor: Optional[str] = Query(None, description="Curseur de la page suivante (next_cursor)"),
+  count: CountMode = Query(CountMode.EXACT, description="Calcul du total : exact, estimated, cached ou none"),
+  db: AsyncSession = Depends(get_read_db)
   ):
   
   # Params pagination
-  pagination = PaginationParams(page=page, page_size=page_size)
+  pagination = PaginationParams(page=page, page_size=page_size, cursor=cursor)
   
   # Construction de la requête
-  query = db.query(User)
+  query = select(User)
+  # Tri par défaut : id (clé du curseur)
+  order_by = [User.id]
   
-  # Appliquer filtres
+  # Appliquer filtres (« contient » servis par les index trigrammes)
   if search:
-    #Recherche globale (prnom OU nom OU email)
-    search_filter = f"%{search}%"
-    query = query.filter(
-      (User.first_name.ilike(search_filter)) |
-      (User.last_name.ilike(search_filter)) |
-      (User.email.ilike(search_filter))
-    )
+    #Recherche globale (prnom OU nom OU email), plus pertinents d'abord
+    search_filter, rank = text_search([User.first_name, User.last_name, User.email], search)
+    query = query.where(search_filter)
+    order_by = [rank, User.id]
   
   if email:
-    query = query.filter(User.email.ilike(f"%{email}%"))
+    query = query.where(contains(User.email, email))
   
   if role:
-        query = query.filter(User.role == role)
+        query = query.where(User.role == role)
     
+  # Utilisateurs actifs par défaut (index partiels WHERE is_active)
+  if is_active is None and not include_inactive:
+      is_active = True
   if is_active is not None:
-      query = query.filter(User.is_active == is_active)
+      query = query.where(User.is_active == is_active)
       
-  # Compter le total après filtres
-  total = query.count()
+  # Compter le total après filtres (exact, estimé, en cache ou aucun)
+  total = await count_total(db, query, count)
   
   # Récupérer les éléments paginés
-  users = query\
-    .offset(pagination.skip)\
-    .limit(pagination.limit)\
-    .all()
+  users, next_cursor = await fetch_page(
+    db, query, pagination, order_by=order_by, descending=bool(search)
+  )
   # Créer la réponse paginé
   return PaginatedResponse.create(
     items=users,
     total=total,
     page=page,
-    page_size=page_size
+    page_size=page_size,
+    next_cursor=next_cursor,
+    total_kind=count
   )
 
 #READ ONE - Récupérer une catgorie par ID
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-  user = db.query(User).filter(User.id == user_id).first()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
+  user = await db.scalar(select(User).where(User.id == user_id))
   if not user:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
@@ -117,13 +130,13 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 
 # UPDATE - Modifier un catégorie
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
   user_id: int,
   user_update: UserUpdate,
-  db: Session = Depends(get_db)
+  db: AsyncSession = Depends(get_async_db)
 ):
   try:
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.scalar(select(User).where(User.id == user_id))
     if not db_user:
       raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -135,10 +148,10 @@ def update_user(
     
     # Vérifier l'unicité de l'email si modifié
     if "email" in update_data:
-      existing = db.query(User).filter(
+      existing = await db.scalar(select(User).where(
         User.email == update_data["email"],
         User.id != user_id
-      ).first()
+      ))
       if existing:
         raise HTTPException(
           status_code=status.HTTP_409_CONFLICT,
@@ -147,19 +160,22 @@ def update_user(
     
     # Si nouveau mot de passe, le hahser
     if "password" in update_data:
-      update_data["hashed_password"] = hash_password(update_data["password"])
+      update_data["hashed_password"] = await hash_password_async(update_data["password"])
       del update_data["password"] # Suppression du MdP en clair (sécurité)
     
     # Appliquer les modifications
     for key, value in update_data.items():
       setattr(db_user, key, value)
     
-    db.commit()
-    db.refresh(db_user)
+    # Nom ou email repris dans les dépenses : invalide leurs ETags
+    if update_data.keys() & USER_DISPLAY_FIELDS:
+      await bump_cache_version(db, USERS_VERSION)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
     
   except IntegrityError as e:
-    db.rollback()
+    await db.rollback()
     raise HTTPException(
       status_code=status.HTTP_400_BAD_REQUEST,
       detail=f"Database integrity error: {str(e)}"
@@ -167,13 +183,13 @@ def update_user(
 
 # DELETE - Supprimer un utilisateur
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-  db_user = db.query(User).filter(User.id == user_id).first()
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+  db_user = await db.scalar(select(User).where(User.id == user_id))
   if not db_user:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND,
       detail=f"User with id {user_id} not found"
     )
-  db.delete(db_user)
-  db.commit()
+  await db.delete(db_user)
+  await db.commit()
   return None
\ No newline at end of file
@@ -2,7 +2,16 @@ from app.schemas.contacts import (
     ContactBase,
     ContactCreate,
     ContactUpdate,
-    ContactResponse
+    ContactResponse,
+    ContactDuplicateCandidate,
+    ContactDuplicatePair,
+    ContactDuplicateReport,
+    ContactUpsertRequest,
+    ContactUpsertError,
+    ContactUpsertReport,
+    SiretBatchRequest,
+    SiretValidationResult,
+    SiretBatchReport,
 )
 from app.schemas.category import(
     CategoryBase,
@@ -19,9 +28,14 @@ from app.schemas.users import (
 from app.schemas.expenses import(
     ExpenseBase,
     ExpenseCreate,
+    ExpenseBatchCreate,
     ExpenseUpdate,
     ExpenseResponse,
     ExpenseDetailResponse,
+    ExpenseImportError,
+    ExpenseImportReport,
+    ExpenseSummaryRow,
+    ExpenseSummary,
 )
 from app.schemas.pagination import PaginationParams, PaginatedResponse
 
@@ -31,6 +45,15 @@ __all__ = [
     "ContactCreate",
     "ContactUpdate",
     "ContactResponse",
+    "ContactDuplicateCandidate",
+    "ContactDuplicatePair",
+    "ContactDuplicateReport",
+    "ContactUpsertRequest",
+    "ContactUpsertError",
+    "ContactUpsertReport",
+    "SiretBatchRequest",
+    "SiretValidationResult",
+    "SiretBatchReport",
     # Categories
     "CategoryBase",
     "CategoryCreate",
@@ -44,9 +67,14 @@ __all__ = [
     # Expenses
     "ExpenseBase",
     "ExpenseCreate",
+    "ExpenseBatchCreate",
     "ExpenseUpdate",
     "ExpenseResponse",
     "ExpenseDetailResponse",
+    "ExpenseImportError",
+    "ExpenseImportReport",
+    "ExpenseSummaryRow",
+    "ExpenseSummary",
     # Pagination
     "PaginationParams",
     "PaginatedResponse"
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, date
+from app.config import CONTACT_UPSERT_MAX_SIZE, SIRET_BATCH_MAX_SIZE
 from app.exceptions import InvalidSiretException
 from app.validators import validate_siret
 from app.enums import ContactType
@@ -177,4 +178,89 @@ class ContactResponse(BaseModel):
   updated_at: datetime
   
   class Config:
-      from_attributes = True
\ No newline at end of file
+      from_attributes = True
+
+
+# === Schémas de la détection des doublons ===
+class ContactDuplicateCandidate(BaseModel):
+  """
+  Contact existant ressemblant à un contact en cours de création,
+  avec le score de ressemblance (0 à 1) et ses raisons.
+  """
+  id: int
+  contact_type: ContactType
+  name: str
+  city: Optional[str] = None
+  siret: Optional[str] = None
+  score: float
+  reasons: List[str] = []
+
+class ContactDuplicatePair(BaseModel):
+  """Paire de contacts probablement en double (contact_id < duplicate_id)"""
+  contact_id: int
+  contact_name: str
+  duplicate_id: int
+  duplicate_name: str
+  score: float
+  reasons: List[str] = []
+
+class ContactDuplicateReport(BaseModel):
+  """
+  Rapport des doublons probables sur toute la table.
+  Seules les paires partageant une clé de blocage sont comparées ;
+  les blocs trop grands (oversized_blocks) sont ignorés.
+  """
+  threshold: float
+  contacts_scanned: int = 0
+  compared_pairs: int = 0
+  oversized_blocks: int = 0
+  pairs: List[ContactDuplicatePair] = []
+  # Vrai si toutes les paires n'ont pas pu être listées (limit)
+  pairs_truncated: bool = False
+
+
+# === Schémas du chargement en masse (upsert) ===
+class ContactUpsertRequest(BaseModel):
+  """
+  Contacts à créer ou mettre à jour, au format de ContactCreate.
+  Chaque contact est validé séparément : un contact invalide est
+  rejeté sans bloquer les autres.
+  """
+  contacts: List[Dict[str, Any]] = Field(..., min_length=1, max_length=CONTACT_UPSERT_MAX_SIZE)
+
+class ContactUpsertError(BaseModel):
+  """Contact refusé lors d'un upsert (position dans la liste), avec la raison"""
+  index: int
+  detail: str
+
+class ContactUpsertReport(BaseModel):
+  """Compte rendu d'un upsert de contacts"""
+  total_rows: int = 0
+  created: int = 0
+  updated: int = 0
+  rejected: int = 0
+  errors: List[ContactUpsertError] = []
+  # Vrai si toutes les erreurs n'ont pas pu être listées (IMPORT_MAX_ERRORS)
+  errors_truncated: bool = False
+
+
+# === Schémas de la validation des SIRET en lot ===
+class SiretBatchRequest(BaseModel):
+  """Lot de SIRET à valider (registre de fournisseurs...)"""
+  sirets: List[str] = Field(..., min_length=1, max_length=SIRET_BATCH_MAX_SIZE)
+  # Ne renvoyer que les SIRET invalides (réponse plus légère)
+  only_invalid: bool = False
+
+class SiretValidationResult(BaseModel):
+  """Validité d'un SIRET du lot : reason vaut empty, length, non_digit ou checksum"""
+  index: int
+  siret: str
+  valid: bool
+  reason: Optional[str] = None
+
+class SiretBatchReport(BaseModel):
+  """Compte rendu de la validation d'un lot de SIRET"""
+  total: int = 0
+  valid: int = 0
+  invalid: int = 0
+  results: List[SiretValidationResult] = []
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
-from app.enums import ExpenseStatus
+from app.config import EXPENSE_BATCH_MAX_SIZE
+from app.enums import ExpenseStatus, ExpenseGroupBy
 
 #Schema de base
 class ExpenseBase(BaseModel):
@@ -29,6 +30,11 @@ class ExpenseCreate(ExpenseBase):
   """
   pass
 
+# Schema pour la création en lot
+class ExpenseBatchCreate(BaseModel):
+  """Dépenses à créer en une seule transaction (tout ou rien)"""
+  expenses: List[ExpenseCreate] = Field(..., min_length=1, max_length=EXPENSE_BATCH_MAX_SIZE)
+
 #Schema pour la modification
 class ExpenseUpdate(BaseModel):
   amount: Optional[Decimal] = Field(None, gt=0)
@@ -81,4 +87,50 @@ class ExpenseDetailResponse(ExpenseResponse):
   category_code: Optional[str] = None
   
   # Informations du fournisseur
-  contact_name: Optional[str] = None
\ No newline at end of file
+  contact_name: Optional[str] = None
+
+# Schemas pour l'import CSV
+class ExpenseImportError(BaseModel):
+  """Ligne du fichier refusée lors d'un import, avec la raison"""
+  line: int
+  detail: str
+
+class ExpenseImportReport(BaseModel):
+  """
+  Compte rendu d'un import CSV.
+  Les lignes invalides sont rejetées sans interrompre l'import.
+  """
+  total_rows: int = 0
+  imported: int = 0
+  rejected: int = 0
+  errors: List[ExpenseImportError] = []
+  # Vrai si toutes les erreurs n'ont pas pu être listées (IMPORT_MAX_ERRORS)
+  errors_truncated: bool = False
+
+
+# Schemas pour le récapitulatif (agrégation SQL)
+class ExpenseSummaryRow(BaseModel):
+  """
+  Un groupe du récapitulatif.
+  Seules les colonnes des axes demandés (group_by) sont renseignées.
+  """
+  category_id: Optional[int] = None
+  category_code: Optional[str] = None
+  category_name: Optional[str] = None
+  contact_id: Optional[int] = None
+  contact_name: Optional[str] = None
+  user_id: Optional[int] = None
+  user_name: Optional[str] = None
+  status: Optional[ExpenseStatus] = None
+  year: Optional[int] = None
+  month: Optional[int] = None
+  
+  total_amount: Decimal
+  expense_count: int
+
+class ExpenseSummary(BaseModel):
+  """Récapitulatif des dépenses filtrées, avec le total général"""
+  group_by: List[ExpenseGroupBy]
+  rows: List[ExpenseSummaryRow]
+  total_amount: Decimal
+  expense_count: int
\ No newline at end of file
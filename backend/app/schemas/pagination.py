@@ -1,5 +1,6 @@
 from typing import Generic, TypeVar, List, Optional
 from pydantic import BaseModel
+from app.enums import CountMode
 
 T = TypeVar('T')
 
@@ -7,6 +8,8 @@ class PaginationParams(BaseModel):
   """Paramètres de pagination"""
   page: int = 1
   page_size: int = 20
+  # Curseur opaque (pagination par clé) : prioritaire sur `page` si fourni
+  cursor: Optional[str] = None
   
   @property
   def skip(self) -> int:
@@ -21,24 +24,45 @@ class PaginationParams(BaseModel):
 class PaginatedResponse(BaseModel, Generic[T]):
   """Réponse paginée générique"""
   items: List[T]
-  total: int
+  # Total (None si count=none) et manière dont il a été obtenu
+  total: Optional[int] = None
+  total_kind: CountMode = CountMode.EXACT
   page: int
   page_size: int
-  total_pages: int
+  total_pages: Optional[int] = None
   has_next: bool
   has_previous: bool
+  # Curseur à renvoyer pour obtenir la page suivante (None si dernière page)
+  next_cursor: Optional[str] = None
   
   @classmethod
-  def create(cls, items: List[T], total: int, page: int, page_size: int):
-    """Crée une réponse paginé"""
-    total_pages = (total + page_size -1) // page_size # Arrondi supérieur
+  def create(
+    cls,
+    items: List[T],
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    next_cursor: Optional[str] = None,
+    total_kind: CountMode = CountMode.EXACT
+  ):
+    """
+    Crée une réponse paginé.
+    `has_next` se déduit de `next_cursor`, calculé par la requête de page
+    (une ligne de plus que demandé) : il reste juste en mode curseur.
+    `total_kind` indique si le total est exact, estimé, mis en cache ou absent.
+    """
+    total_pages = None
+    if total is not None:
+      total_pages = (total + page_size -1) // page_size # Arrondi supérieur
     
     return cls(
       items = items,
       total = total,
+      total_kind = total_kind,
       page = page,
       page_size = page_size,
       total_pages = total_pages,
-      has_next = page < total_pages,
-      has_previous = page > 1
+      has_next = next_cursor is not None,
+      has_previous = page > 1,
+      next_cursor = next_cursor
     )
\ No newline at end of file
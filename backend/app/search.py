@@ -0,0 +1,47 @@
+from typing import Any, Sequence, Tuple
+
+from sqlalchemy import Float, func, or_
+
+
+def _contains_pattern(term: str) -> str:
+  """Motif ILIKE « contient », en échappant les jokers saisis (%, _)"""
+  escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+  return f"%{escaped}%"
+
+
+def contains(column: Any, term: str):
+  """
+  Filtre « contient » insensible à la casse (ILIKE '%term%').
+  Servi par l'index GIN pg_trgm de la colonne (migration 5cc3a32aeb87).
+
+  Args:
+    column: Colonne texte indexée en gin_trgm_ops
+    term: Texte recherché
+
+  Returns:
+    Condition SQL à passer à .where()
+  """
+  return column.ilike(_contains_pattern(term), escape="\\")
+
+
+def text_search(columns: Sequence[Any], term: str) -> Tuple[Any, Any]:
+  """
+  Recherche globale sur plusieurs colonnes, avec score de pertinence.
+
+  Le filtre (une colonne au moins contient le terme) passe par les index
+  trigrammes ; le score est la meilleure word_similarity entre le terme
+  et chaque colonne (1.0 = le terme apparaît tel quel comme mot).
+
+  Args:
+    columns: Colonnes texte indexées en gin_trgm_ops
+    term: Texte recherché
+
+  Returns:
+    Tuple (condition SQL, score à trier par ordre décroissant)
+  """
+  condition = or_(*[contains(column, term) for column in columns])
+  rank = func.greatest(
+    *[func.word_similarity(term, column) for column in columns],
+    type_=Float
+  )
+  return condition, rank
@@ -1,5 +1,25 @@
+import asyncio
 import bcrypt
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from app.config import (
+  BCRYPT_ROUNDS,
+  HASH_POOL_WORKERS,
+  HASH_POOL_MAX_PENDING,
+  BCRYPT_REHASH_ON_VERIFY
+)
+from app.exceptions import HashingPoolBusyException
+
+# Pool dédié au hachage : borne le CPU consommé par bcrypt sans
+# occuper le threadpool partagé de FastAPI
+_hash_executor = ThreadPoolExecutor(
+  max_workers=HASH_POOL_WORKERS,
+  thread_name_prefix="bcrypt"
+)
+# Hachages en cours ou en attente (modifié uniquement depuis la boucle asyncio)
+_hash_pending = 0
 
 def _pre_hash_password(password: str) -> bytes:
   """
@@ -30,7 +50,7 @@ def hash_password(password: str) -> str:
   pre_hashed = _pre_hash_password(password)
   
   # Générer un salt et hasher avec bcrypt
-  salt = bcrypt.gensalt(rounds=12)
+  salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
   hashed = bcrypt.hashpw(pre_hashed, salt)
   
   return hashed.decode('utf-8')
@@ -49,4 +69,81 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
   # Pre-hashing
   pre_hashed = _pre_hash_password(plain_password)
   
-  return bcrypt.checkpw(pre_hashed, hashed_password.encode('utf-8'))
\ No newline at end of file
+  return bcrypt.checkpw(pre_hashed, hashed_password.encode('utf-8'))
+
+def needs_rehash(hashed_password: str) -> bool:
+  """
+  Indique si un hash a été calculé avec un autre coût que BCRYPT_ROUNDS.
+
+  Args:
+      hashed_password: Hash bcrypt ($2b$<coût>$...)
+
+  Returns:
+      True si le hash doit être recalculé
+  """
+  try:
+    rounds = int(hashed_password.split("$")[2])
+  except (IndexError, ValueError):
+    return True
+  return rounds != BCRYPT_ROUNDS
+
+async def _run_in_hash_pool(func, *args):
+  """
+  Exécute un calcul bcrypt dans le pool dédié.
+  Refuse (503) au-delà de HASH_POOL_MAX_PENDING calculs en attente,
+  pour qu'une rafale de créations ne dégrade pas le reste de l'API.
+  """
+  global _hash_pending
+  if _hash_pending >= HASH_POOL_MAX_PENDING:
+    raise HashingPoolBusyException()
+
+  _hash_pending += 1
+  try:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, func, *args)
+  finally:
+    _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+  """
+  Version asynchrone de hash_password (pool bcrypt borné).
+
+  Args:
+      password: Mot de passe en clair
+
+  Returns:
+      Mot de passe hashé (string)
+  """
+  return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+  """
+  Version asynchrone de verify_password (pool bcrypt borné).
+
+  Returns:
+      True si le mot de passe correspond
+  """
+  return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def verify_and_rehash_password(
+  plain_password: str,
+  hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+  """
+  Vérifie un mot de passe et, si BCRYPT_REHASH_ON_VERIFY est activé,
+  recalcule le hash quand le coût configuré a changé.
+  L'appelant enregistre le nouveau hash s'il est renvoyé.
+
+  Args:
+      plain_password: Mot de passe en clair
+      hashed_password: Mot de passe hashé
+
+  Returns:
+      Tuple (mot de passe valide, nouveau hash ou None)
+  """
+  if not await verify_password_async(plain_password, hashed_password):
+    return False, None
+
+  if BCRYPT_REHASH_ON_VERIFY and needs_rehash(hashed_password):
+    return True, await hash_password_async(plain_password)
+  return True, None
\ No newline at end of file
@@ -1,4 +1,68 @@
 import re
+from typing import Iterable, List, NamedTuple, Optional
+
+# Luhn : valeur de chaque chiffre, indexée par son code ASCII
+# (chiffre doublé : 2 × d, moins 9 au-delà de 9)
+_PLAIN = bytes(48) + bytes(range(10)) + bytes(198)
+_DOUBLED = bytes(48) + bytes(2 * d if d < 5 else 2 * d - 9 for d in range(10)) + bytes(198)
+# Somme de contrôle -> 1 si multiple de 10
+_MULTIPLE_OF_10 = bytes(1 if total % 10 == 0 else 0 for total in range(256))
+
+
+class SiretCheck(NamedTuple):
+  """Résultat de la validation d'un SIRET d'un lot"""
+  siret: str
+  valid: bool
+  # None si valide, sinon : empty, length, non_digit, checksum
+  reason: Optional[str]
+
+
+def _luhn_matrix(sirets: List[str]) -> bytes:
+  """
+  Clé de Luhn d'un lot de SIRET de 14 chiffres ASCII : un octet par
+  SIRET, 1 si la somme de contrôle est un multiple de 10.
+
+  Les SIRET forment une matrice de chiffres (une ligne de 14 octets par
+  SIRET). Les colonnes paires (doublées) et impaires sont converties en
+  valeurs par table (bytes.translate), puis les 14 colonnes sont
+  additionnées comme grands entiers, un octet par ligne : une somme
+  dépasse au plus 126, donc aucune retenue ne déborde sur la ligne
+  voisine. Aucune boucle Python par chiffre.
+  """
+  if not sirets:
+    return b""
+  matrix = "".join(sirets).encode("ascii")
+  values = bytearray(len(matrix))
+  values[0::2] = matrix[0::2].translate(_DOUBLED)
+  values[1::2] = matrix[1::2].translate(_PLAIN)
+  totals = sum(int.from_bytes(values[column::14], "big") for column in range(14))
+  return totals.to_bytes(len(sirets), "big").translate(_MULTIPLE_OF_10)
+
+
+def validate_sirets(sirets: Iterable[str]) -> List[SiretCheck]:
+  """
+  Valide un lot de SIRET (registre de fournisseurs, import...).
+  Les espaces sont ignorés (« 732 829 320 00074 » est accepté) ; le
+  SIRET renvoyé est sans espaces.
+
+  Returns:
+    Un SiretCheck par SIRET, dans l'ordre reçu
+  """
+  compact = ["".join((siret or "").split()) for siret in sirets]
+  well_formed = [len(siret) == 14 and siret.isdigit() and siret.isascii() for siret in compact]
+  luhn = iter(_luhn_matrix([siret for siret, ok in zip(compact, well_formed) if ok]))
+
+  checks = []
+  for siret, ok in zip(compact, well_formed):
+    if ok:
+      valid = next(luhn) == 1
+      checks.append(SiretCheck(siret, valid, None if valid else "checksum"))
+    elif not siret:
+      checks.append(SiretCheck(siret, False, "empty"))
+    else:
+      checks.append(SiretCheck(siret, False, "length" if len(siret) != 14 else "non_digit"))
+  return checks
+
 
 def validate_siret(siret: str) -> bool:
   """
@@ -12,24 +76,11 @@ def validate_siret(siret: str) -> bool:
   if not siret:
     return True
   
-  if not re.match(r'^\d{14}$', siret):
+  if not re.match(r'^[0-9]{14}$', siret):
     return False
   
-  #Algorithme de Luhn pour vérifier la validité
-  total = 0
-  for i, digit in enumerate(siret):
-    n = int(digit)
-    # Les chiffres en position impaire (index pair) sont doublés
-    # On compte de droite à gauche, donc on inverse
-    if (len(siret) - i) % 2 == 0:
-      n *= 2
-      # Si le résultat est > 9, on soustrait 9
-      if n > 9:
-        n -= 9
-    total += n
-    
-    # Le total doit être un multiple de 10
-  return total % 10 == 0
+  # Algorithme de Luhn (même calcul que validate_sirets)
+  return _luhn_matrix([siret]) == b"\x01"
 
 def format_siret(siret: str) -> str:
   """ 
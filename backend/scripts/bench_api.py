@@ -0,0 +1,235 @@
+"""
+Banc de charge de l'API : envoie des requêtes à concurrence fixe sur un
+serveur lancé (uvicorn) et rapporte débit et latences p50/p95/p99.
+
+Scénarios :
+  list     GET /api/expenses/ (pagination par offset, pages au hasard)
+  cursor   GET /api/expenses/ (parcours par curseur depuis le début)
+  filtered GET /api/expenses/ filtrée par catégorie et période
+  detail   GET /api/expenses/{id} (ids tirés au hasard)
+  create   POST /api/expenses/ (écrit en base !)
+  summary  GET /api/expenses/summary?group_by=category
+
+Chaque scénario tourne `--duration` secondes après `--warmup` secondes
+de chauffe non mesurées. À lancer sur une base remplie par
+scripts/seed_dataset.py pour des chiffres représentatifs.
+
+Usage (depuis backend/, serveur lancé sur le port 8000) :
+  python scripts/bench_api.py --concurrency 20 --duration 30
+  python scripts/bench_api.py --scenarios list detail --count estimated --json bench.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+import httpx
+
+
+class ScenarioResult:
+  """Latences (secondes) et erreurs d'un scénario"""
+
+  def __init__(self, name: str):
+    self.name = name
+    self.latencies: List[float] = []
+    self.errors = 0
+    self.status_codes: Dict[int, int] = {}
+    self.elapsed = 0.0
+
+  def record(self, seconds: float, status_code: int, ok: bool):
+    self.latencies.append(seconds)
+    self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+    if not ok:
+      self.errors += 1
+
+  def summary(self) -> dict:
+    latencies = sorted(self.latencies)
+    # Centiles 1 à 99 (méthode inclusive : bornés par le min et le max)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+      "scenario": self.name,
+      "requests": len(latencies),
+      "errors": self.errors,
+      "throughput": len(latencies) / self.elapsed if self.elapsed else 0.0,
+      "p50_ms": cuts[49] * 1000 if cuts else 0.0,
+      "p95_ms": cuts[94] * 1000 if cuts else 0.0,
+      "p99_ms": cuts[98] * 1000 if cuts else 0.0,
+      "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+      "status_codes": self.status_codes,
+    }
+
+
+class BenchContext:
+  """Données de référence tirées du serveur avant les mesures"""
+
+  def __init__(self, args, expense_ids: List[int], category_ids: List[int], user_id: int, total: int):
+    self.args = args
+    self.expense_ids = expense_ids
+    self.category_ids = category_ids
+    self.user_id = user_id
+    self.total = total
+    self.rng = random.Random(args.seed)
+    self.cursors: List[str] = []
+
+
+async def load_context(client: httpx.AsyncClient, args) -> BenchContext:
+  """Ids de dépenses, catégories et utilisateur pour construire les requêtes"""
+  page = (await client.get("/api/expenses/", params={"page_size": 100, "count": "estimated"})).raise_for_status().json()
+  expense_ids = [item["id"] for item in page["items"]]
+  # Des ids répartis sur toute la table, pas seulement les plus récents
+  pages = max(min((page["total"] or 0) // 100, args.max_page), 1)
+  for offset_page in random.Random(args.seed).sample(range(1, pages + 1), k=min(20, pages)):
+    response = await client.get("/api/expenses/", params={"page_size": 100, "page": offset_page, "count": "none"})
+    expense_ids += [item["id"] for item in response.json().get("items", [])]
+
+  categories = (await client.get("/api/categories/", params={"page_size": 100})).raise_for_status().json()
+  users = (await client.get("/api/users/", params={"page_size": 1})).raise_for_status().json()
+  if not expense_ids or not categories["items"] or not users["items"]:
+    raise SystemExit("Base vide : lancer d'abord scripts/seed_dataset.py")
+
+  return BenchContext(
+    args,
+    expense_ids,
+    [item["id"] for item in categories["items"]],
+    args.user_id or users["items"][0]["id"],
+    page["total"] or len(expense_ids),
+  )
+
+
+# === Scénarios : (client, contexte) -> réponse ===
+
+async def scenario_list(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+  page_size = ctx.args.page_size
+  last_page = max(min(ctx.total // page_size, ctx.args.max_page), 1)
+  params = {"page": ctx.rng.randint(1, last_page), "page_size": page_size, "count": ctx.args.count}
+  return await client.get("/api/expenses/", params=params)
+
+
+async def scenario_cursor(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+  # Chaque appel reprend un parcours en cours (ou en commence un nouveau)
+  cursor = ctx.cursors.pop() if ctx.cursors else None
+  params = {"page_size": ctx.args.page_size, "count": "none"}
+  if cursor:
+    params["cursor"] = cursor
+  response = await client.get("/api/expenses/", params=params)
+  if response.status_code == 200:
+    next_cursor = response.json().get("next_cursor")
+    if next_cursor and len(ctx.cursors) < 1000:
+      ctx.cursors.append(next_cursor)
+  return response
+
+
+async def scenario_filtered(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+  start = date.today() - timedelta(days=ctx.rng.randrange(365 * 3))
+  params = {
+    "category_id": ctx.rng.choice(ctx.category_ids),
+    "start_date": start.isoformat(),
+    "end_date": (start + timedelta(days=90)).isoformat(),
+    "page_size": ctx.args.page_size,
+    "count": ctx.args.count,
+  }
+  return await client.get("/api/expenses/", params=params)
+
+
+async def scenario_detail(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+  return await client.get(f"/api/expenses/{ctx.rng.choice(ctx.expense_ids)}")
+
+
+async def scenario_create(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+  payload = {
+    "amount": f"{ctx.rng.lognormvariate(4.5, 0.9):.2f}",
+    "description": "Banc de charge — dépense de test",
+    "expense_date": (date.today() - timedelta(days=ctx.rng.randrange(60))).isoformat(),
+    "category_id": ctx.rng.choice(ctx.category_ids),
+  }
+  return await client.post("/api/expenses/", params={"user_id": ctx.user_id}, json=payload)
+
+
+async def scenario_summary(client: httpx.AsyncClient, ctx: BenchContext) -> httpx.Response:
+  return await client.get("/api/expenses/summary", params={"group_by": "category"})
+
+
+SCENARIOS: Dict[str, Callable] = {
+  "list": scenario_list,
+  "cursor": scenario_cursor,
+  "filtered": scenario_filtered,
+  "detail": scenario_detail,
+  "create": scenario_create,
+  "summary": scenario_summary,
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: BenchContext, name: str) -> ScenarioResult:
+  """`concurrency` workers en boucle fermée : chauffe puis mesure"""
+  scenario = SCENARIOS[name]
+  result = ScenarioResult(name)
+  measuring = False
+
+  async def worker(deadline: float):
+    while time.perf_counter() < deadline:
+      start = time.perf_counter()
+      try:
+        response = await scenario(client, ctx)
+        status_code, ok = response.status_code, response.status_code < 400
+      except httpx.HTTPError:
+        status_code, ok = 0, False
+      if measuring:
+        result.record(time.perf_counter() - start, status_code, ok)
+
+  if ctx.args.warmup:
+    await asyncio.gather(*(worker(time.perf_counter() + ctx.args.warmup) for _ in range(ctx.args.concurrency)))
+
+  measuring = True
+  started = time.perf_counter()
+  deadline = started + ctx.args.duration
+  await asyncio.gather(*(worker(deadline) for _ in range(ctx.args.concurrency)))
+  result.elapsed = time.perf_counter() - started
+  return result
+
+
+def print_report(summaries: List[dict], args):
+  print(f"\nconcurrence={args.concurrency} durée={args.duration}s page_size={args.page_size} count={args.count}")
+  print(f"{'scénario':<10} {'requêtes':>9} {'erreurs':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+  for row in summaries:
+    print(
+      f"{row['scenario']:<10} {row['requests']:>9} {row['errors']:>8} {row['throughput']:>9.1f} "
+      f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+    )
+
+
+async def main(args):
+  limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+  async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+    ctx = await load_context(client, args)
+    print(f"{ctx.total:,} dépenses, {len(ctx.expense_ids)} ids échantillonnés, {len(ctx.category_ids)} catégories")
+
+    summaries = []
+    for name in args.scenarios:
+      print(f"  {name}...", flush=True)
+      summaries.append((await run_scenario(client, ctx, name)).summary())
+
+  print_report(summaries, args)
+  if args.json:
+    with open(args.json, "w", encoding="utf-8") as output:
+      json.dump({"settings": vars(args), "results": summaries}, output, indent=2)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--base-url", default="http://localhost:8000", help="URL du serveur")
+  parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=["list", "cursor", "filtered", "detail", "create"])
+  parser.add_argument("--concurrency", type=int, default=10, help="Requêtes simultanées")
+  parser.add_argument("--duration", type=float, default=20, help="Durée mesurée par scénario (s)")
+  parser.add_argument("--warmup", type=float, default=3, help="Chauffe non mesurée par scénario (s)")
+  parser.add_argument("--page-size", type=int, default=20)
+  parser.add_argument("--max-page", type=int, default=500, help="Page maximale du scénario list")
+  parser.add_argument("--count", choices=["exact", "estimated", "cached", "none"], default="exact", help="Mode de calcul du total")
+  parser.add_argument("--user-id", type=int, default=None, help="Utilisateur des créations (défaut : le premier)")
+  parser.add_argument("--timeout", type=float, default=30, help="Timeout d'une requête (s)")
+  parser.add_argument("--seed", type=int, default=1, help="Graine (requêtes reproductibles)")
+  parser.add_argument("--json", default=None, help="Écrire aussi les résultats dans ce fichier")
+  asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+"""
+Compare les deux chemins de lecture de la liste des dépenses :
+- orm : select(Expense) + 3 joinedload, puis un dict recopié champ par champ
+- projection : expense_detail_query() (colonnes de ExpenseDetailResponse)
+
+Chaque mesure inclut la requête, la construction des lignes et la
+validation en ExpenseDetailResponse (comme le fait la route).
+
+Usage (depuis backend/, sur une base déjà remplie) :
+  python scripts/bench_expense_read_paths.py --sizes 100 1000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Expense
+from app.routes.expenses import expense_detail_query
+from app.schemas import ExpenseDetailResponse
+
+details = TypeAdapter(List[ExpenseDetailResponse])
+
+
+async def read_orm(db, size: int):
+  """Ancien chemin : objets ORM + relations en jointure, dict à la main"""
+  query = (
+    select(Expense)
+    .options(
+      joinedload(Expense.user),
+      joinedload(Expense.category),
+      joinedload(Expense.contact)
+    )
+    .order_by(Expense.expense_date.desc(), Expense.id.desc())
+    .limit(size)
+  )
+  expenses = (await db.scalars(query)).all()
+  rows = []
+  for expense in expenses:
+    rows.append({
+      "id": expense.id,
+      "amount": expense.amount,
+      "description": expense.description,
+      "expense_date": expense.expense_date,
+      "status": expense.status,
+      "user_id": expense.user_id,
+      "category_id": expense.category_id,
+      "contact_id": expense.contact_id,
+      "created_at": expense.created_at,
+      "updated_at": expense.updated_at,
+      "user_email": expense.user.email if expense.user else None,
+      "user_name": expense.user.full_name if expense.user else None,
+      "category_name": expense.category.name if expense.category else None,
+      "category_code": expense.category.code if expense.category else None,
+      "contact_name": expense.contact.name if expense.contact else None
+    })
+  return details.validate_python(rows)
+
+
+async def read_projection(db, size: int):
+  """Nouveau chemin : projection Core, lignes converties directement"""
+  query = (
+    expense_detail_query()
+    .order_by(Expense.expense_date.desc(), Expense.id.desc())
+    .limit(size)
+  )
+  rows = [row._asdict() for row in await db.execute(query)]
+  return details.validate_python(rows)
+
+
+async def measure(read, size: int, repeat: int) -> List[float]:
+  """Durées (s) de `repeat` lectures, chacune dans une session neuve"""
+  timings = []
+  for _ in range(repeat):
+    async with AsyncSessionLocal() as db:
+      start = time.perf_counter()
+      await read(db, size)
+      timings.append(time.perf_counter() - start)
+  return timings
+
+
+async def main(sizes: List[int], repeat: int):
+  async with AsyncSessionLocal() as db:
+    available = await db.scalar(select(func.count()).select_from(Expense))
+  print(f"{available} dépenses en base")
+  if available < max(sizes):
+    print("⚠️  Moins de lignes que la plus grande page : remplir la base d'abord")
+
+  print(f"{'page':>6} | {'chemin':<10} | {'médiane (ms)':>12} | {'lignes/s':>10}")
+  for size in sizes:
+    for name, read in (("orm", read_orm), ("projection", read_projection)):
+      # Une lecture à blanc (cache du plan, connexion)
+      await measure(read, size, 1)
+      timings = await measure(read, size, repeat)
+      median = statistics.median(timings)
+      rows = min(size, available)
+      print(f"{size:>6} | {name:<10} | {median * 1000:>12.2f} | {rows / median:>10.0f}")
+
+  await async_engine.dispose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="Tailles de page")
+  parser.add_argument("--repeat", type=int, default=20, help="Mesures par taille et par chemin")
+  args = parser.parse_args()
+  asyncio.run(main(args.sizes, args.repeat))
@@ -0,0 +1,83 @@
+"""
+Compare la sérialisation des réponses : JSONResponse (json.dumps, défaut
+de FastAPI) et FastJSONResponse (orjson, défaut de l'API).
+
+Reproduit le chemin d'une route : validation par le response_model,
+model_dump(mode="json") puis rendu par la classe de réponse. Les pages
+de dépenses sont générées en mémoire (pas de base nécessaire).
+
+Usage (depuis backend/) :
+  python scripts/bench_json.py --sizes 20 100 1000 --repeat 50
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse
+
+from app.enums import ExpenseStatus
+from app.responses import FastJSONResponse
+from app.schemas import ExpenseDetailResponse, PaginatedResponse
+
+
+def make_page(size: int) -> PaginatedResponse[ExpenseDetailResponse]:
+  """Page de dépenses détaillées, comme la renvoie GET /api/expenses"""
+  now = datetime.now(timezone.utc)
+  items = [
+    ExpenseDetailResponse(
+      id=i,
+      amount=Decimal("1234.56") + i,
+      description=f"Facture n°{i} — électricité presbytère",
+      expense_date=date(2024, 1, 1) + timedelta(days=i % 365),
+      status=ExpenseStatus.PENDING,
+      user_id=1,
+      category_id=i % 40 + 1,
+      contact_id=i % 200 + 1,
+      created_at=now,
+      updated_at=now,
+      user_email="tresorier@paroisse.fr",
+      user_name="Jean Dupont",
+      category_name="Électricité",
+      category_code="6061",
+      contact_name="EDF"
+    )
+    for i in range(size)
+  ]
+  return PaginatedResponse[ExpenseDetailResponse].create(
+    items=items, total=size * 10, page=1, page_size=size
+  )
+
+
+def measure(page, response_class, repeat: int) -> float:
+  """Durée médiane (s) de model_dump + rendu"""
+  timings = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    response_class(page.model_dump(mode="json"))
+    timings.append(time.perf_counter() - start)
+  return statistics.median(timings)
+
+
+def main(sizes: List[int], repeat: int):
+  print(f"{'page':>6} | {'classe':<16} | {'médiane (ms)':>12} | {'pages/s':>9} | {'gain':>5}")
+  for size in sizes:
+    page = make_page(size)
+    baseline = measure(page, JSONResponse, repeat)
+    fast = measure(page, FastJSONResponse, repeat)
+    for name, median in (("JSONResponse", baseline), ("FastJSONResponse", fast)):
+      print(f"{size:>6} | {name:<16} | {median * 1000:>12.3f} | {1 / median:>9.0f} | {baseline / median:>4.1f}x")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000], help="Tailles de page")
+  parser.add_argument("--repeat", type=int, default=50, help="Mesures par taille et par classe")
+  args = parser.parse_args()
+  main(args.sizes, args.repeat)
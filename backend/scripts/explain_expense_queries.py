@@ -0,0 +1,132 @@
+"""
+Plans d'exécution (EXPLAIN ANALYZE) des requêtes de GET /api/expenses :
+agrégat de l'ETag (max(updated_at), count) puis page triée sur
+(expense_date desc, id desc), pour les combinaisons de filtres courantes.
+
+Les requêtes sont construites par le code des routes (expense_filters,
+expense_detail_query), pas recopiées, et passent par le pilote de l'API
+(asyncpg) avec leurs paramètres liés ($1, $2...) : PREPARE puis EXPLAIN
+EXECUTE. Par défaut en plan générique (plan_cache_mode =
+force_generic_plan), celui qu'adopte PostgreSQL pour une instruction
+préparée répétée : un index partiel dont le prédicat dépend d'un
+paramètre n'y est pas utilisable.
+À lancer sur une base remplie par scripts/seed_dataset.py, avant et après
+une migration d'index pour comparer.
+
+Usage (depuis backend/) :
+  python scripts/explain_expense_queries.py
+  python scripts/explain_expense_queries.py --cases pending user_period --full
+  python scripts/explain_expense_queries.py --plan-mode custom
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.dialects import postgresql
+
+from app.database import async_engine
+from app.enums import ExpenseStatus
+from app.models import Expense
+from app.routes.expenses import expense_detail_query, expense_filters
+
+FILTER_NAMES = ("user_id", "category_id", "contact_id", "status", "min_amount", "max_amount", "start_date", "end_date")
+
+
+def filters(**values) -> list:
+  """Conditions de expense_filters (paramètres absents : None)"""
+  return expense_filters(**{name: values.get(name) for name in FILTER_NAMES})
+
+
+async def build_cases(connection) -> dict:
+  """Combinaisons de filtres, avec des valeurs présentes dans la base"""
+  user_id, category_id = (await connection.execute(
+    select(Expense.user_id, Expense.category_id).group_by(Expense.user_id, Expense.category_id)
+    .order_by(func.count().desc()).limit(1)
+  )).one()
+  last_date = await connection.scalar(select(func.max(Expense.expense_date)))
+  quarter = {"start_date": last_date - timedelta(days=90), "end_date": last_date}
+
+  return {
+    "all": filters(),
+    "status": filters(status=ExpenseStatus.PAID),
+    "pending": filters(status=ExpenseStatus.PENDING),
+    "user": filters(user_id=user_id),
+    "category": filters(category_id=category_id),
+    "period": filters(**quarter),
+    "user_period": filters(user_id=user_id, **quarter),
+    "category_period": filters(category_id=category_id, **quarter),
+    "pending_period": filters(status=ExpenseStatus.PENDING, **quarter),
+    # Page profonde par curseur : (expense_date, id) < valeurs du curseur
+    "cursor": filters() + [tuple_(Expense.expense_date, Expense.id) < (date(last_date.year - 2, 6, 30), 0)],
+  }
+
+
+def statements(conditions: list) -> dict:
+  """Les deux requêtes SQL de la route pour ces filtres"""
+  page = (
+    expense_detail_query().where(*conditions)
+    .order_by(Expense.expense_date.desc(), Expense.id.desc())
+    .limit(21)
+  )
+  # Même agrégat que list_etag (et le total exact)
+  etag = select(func.max(Expense.updated_at), func.count()).select_from(Expense).where(*conditions)
+  return {"etag": etag, "page": page}
+
+
+async def explain(connection, name: str, statement, full: bool) -> list:
+  """
+  Plan de l'instruction telle que l'API l'envoie : SQL à paramètres
+  ($1, $2...) préparé, exécuté avec les valeurs du cas
+  """
+  compiled = statement.compile(dialect=async_engine.dialect)
+  # Valeurs des paramètres, rendues en littéraux pour EXECUTE
+  # (le plan générique ne dépend pas de ces valeurs)
+  arguments = [
+    str(literal(compiled.params[key], compiled.binds[key].type).compile(
+      dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+    for key in compiled.positiontup
+  ]
+  await connection.exec_driver_sql(f"PREPARE {name} AS {compiled}")
+  try:
+    execute = f"EXECUTE {name}({', '.join(arguments)})" if arguments else f"EXECUTE {name}"
+    rows = (await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {execute}")).scalars().all()
+  finally:
+    await connection.exec_driver_sql(f"DEALLOCATE {name}")
+  if full:
+    return rows
+  # Nœuds du plan (sans le détail des conditions) et temps total
+  return [row for row in rows if "->" in row or row == rows[0] or row.startswith("Execution Time")]
+
+
+async def run(args):
+  async with async_engine.connect() as connection:
+    await connection.exec_driver_sql(f"SET plan_cache_mode = force_{args.plan_mode}_plan")
+    cases = await build_cases(connection)
+    for name in args.cases or cases:
+      for kind, statement in statements(cases[name]).items():
+        print(f"=== {name} / {kind} ({args.plan_mode})")
+        for line in await explain(connection, f"explain_{name}_{kind}", statement, args.full):
+          print(f"  {line}")
+        print()
+  await async_engine.dispose()
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--cases", nargs="+", default=None, help="Cas à expliquer (défaut : tous)")
+  parser.add_argument("--full", action="store_true", help="Plans complets (conditions, tampons)")
+  parser.add_argument(
+    "--plan-mode", choices=["generic", "custom"], default="generic",
+    help="Plan générique (instruction préparée répétée, défaut) ou personnalisé (valeurs connues)"
+  )
+  asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+  main()
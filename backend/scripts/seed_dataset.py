@@ -0,0 +1,284 @@
+"""
+Remplit la base avec un jeu de données paroissial synthétique mais réaliste,
+pour reproduire la charge de production (benchmarks, EXPLAIN, index).
+
+- utilisateurs : prêtres, trésoriers, bénévoles, administrateurs
+- catégories : plan comptable (codes PCG des charges d'une paroisse)
+- contacts : tous les ContactType, SIRET valides pour les fournisseurs
+- dépenses : montants log-normaux par catégorie, saisonnalité (chauffage
+  l'hiver), fournisseurs habituels par catégorie, statuts selon l'ancienneté
+
+Les lignes sont envoyées par COPY, par lots : plusieurs millions de dépenses
+se chargent en quelques minutes. Sans --truncate, les données sont ajoutées
+à l'existant (catégories PCG réutilisées si déjà présentes).
+
+Usage (depuis backend/) :
+  python scripts/seed_dataset.py --expenses 2000000 --years 5
+  python scripts/seed_dataset.py --truncate --expenses 100000 --seed 42
+"""
+import argparse
+import csv
+import io
+import math
+import random
+import sys
+import time
+import unicodedata
+import uuid
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.database import get_sync_engine
+from app.enums import ContactType, ExpenseStatus, UserRole
+from app.normalize import contact_name_key
+from app.utils import hash_password
+from app.validators import validate_siret
+
+# Code PCG -> (libellé, montant médian €, dispersion log-normale, poids, saisonnier)
+CATEGORIES = {
+  "6061": ("Électricité et gaz", 420, 0.6, 8, True),
+  "60611": ("Chauffage (fioul, bois)", 1800, 0.5, 3, True),
+  "6063": ("Petit équipement", 85, 0.9, 6, False),
+  "6064": ("Fournitures de bureau", 45, 0.7, 7, False),
+  "6068": ("Fournitures liturgiques (hosties, cierges)", 120, 0.6, 9, False),
+  "6132": ("Locations immobilières", 650, 0.3, 2, False),
+  "6135": ("Locations de matériel", 180, 0.7, 2, False),
+  "6152": ("Entretien des bâtiments", 900, 1.1, 4, False),
+  "6155": ("Entretien du mobilier et de l'orgue", 350, 0.9, 2, False),
+  "6156": ("Maintenance (chaudière, cloches)", 400, 0.5, 2, False),
+  "616": ("Assurances", 1200, 0.4, 1, False),
+  "6181": ("Documentation, abonnements", 60, 0.5, 3, False),
+  "6226": ("Honoraires (organiste, intervenants)", 150, 0.5, 6, False),
+  "6231": ("Annonces et bulletin paroissial", 220, 0.6, 3, False),
+  "6251": ("Déplacements", 40, 0.8, 5, False),
+  "6257": ("Réceptions, repas paroissiaux", 160, 0.8, 4, False),
+  "6261": ("Frais postaux", 25, 0.6, 3, False),
+  "6262": ("Téléphone et internet", 55, 0.3, 4, False),
+  "627": ("Services bancaires", 12, 0.5, 4, False),
+  "6281": ("Cotisations", 90, 0.5, 1, False),
+  "6511": ("Redevances logiciels", 30, 0.4, 2, False),
+  "6571": ("Contribution diocésaine", 2500, 0.4, 1, False),
+  "6575": ("Aides et secours", 80, 0.9, 3, False),
+  "6588": ("Charges diverses", 50, 1.0, 2, False),
+}
+
+# Facteur mensuel des catégories saisonnières (chauffage, énergie)
+WINTER_FACTOR = {1: 2.2, 2: 2.0, 3: 1.5, 4: 1.0, 5: 0.6, 6: 0.4, 7: 0.3, 8: 0.3, 9: 0.5, 10: 1.0, 11: 1.6, 12: 2.1}
+
+FIRST_NAMES = ["Jean", "Marie", "Pierre", "Anne", "Paul", "Catherine", "Jacques", "Thérèse", "Louis",
+               "Bernadette", "François", "Claire", "Michel", "Monique", "Joseph", "Élisabeth", "Luc", "Agnès"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy",
+              "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David", "Bertrand", "Roux"]
+CITIES = [("Paris", "75006"), ("Lyon", "69005"), ("Lille", "59000"), ("Nantes", "44000"), ("Rennes", "35000"),
+          ("Bordeaux", "33000"), ("Toulouse", "31000"), ("Strasbourg", "67000"), ("Tours", "37000"), ("Reims", "51100")]
+SUPPLIER_KINDS = ["Électricité", "Plomberie", "Chauffage", "Librairie", "Imprimerie", "Fleurs", "Orgues",
+                  "Menuiserie", "Traiteur", "Bureautique", "Assurances", "Transports", "Cierges", "Informatique"]
+MONTHS = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août", "septembre",
+          "octobre", "novembre", "décembre"]
+
+COPY_BATCH = 50_000
+
+
+def random_siret(rng: random.Random) -> str:
+  """SIRET aléatoire passant la clé de Luhn"""
+  prefix = "".join(rng.choice("0123456789") for _ in range(13))
+  for last in "0123456789":
+    if validate_siret(prefix + last):
+      return prefix + last
+
+
+def ascii_slug(value: str) -> str:
+  """« Thérèse » -> « therese » (adresses e-mail)"""
+  return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode().lower()
+
+
+def copy_rows(cursor, table: str, columns, rows) -> int:
+  """COPY des lignes (itérable de tuples) par lots de COPY_BATCH"""
+  total = 0
+  buffer = io.StringIO()
+  writer = csv.writer(buffer)
+  sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')"
+
+  def flush():
+    buffer.seek(0)
+    cursor.copy_expert(sql, buffer)
+    buffer.seek(0)
+    buffer.truncate()
+
+  for row in rows:
+    writer.writerow(row)
+    total += 1
+    if total % COPY_BATCH == 0:
+      flush()
+      print(f"  {table}: {total:,} lignes", end="\r", flush=True)
+  flush()
+  print(f"  {table}: {total:,} lignes")
+  return total
+
+
+def seed_users(cursor, rng: random.Random, count: int, tag: str):
+  """Utilisateurs (un seul hash bcrypt partagé : « password123 »)"""
+  hashed = hash_password("password123")
+  roles = [UserRole.PRIEST] * 2 + [UserRole.TREASURER] * 2 + [UserRole.ADMIN] + [UserRole.VOLUNTEER] * 5
+
+  def rows():
+    for i in range(count):
+      first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+      email = f"{ascii_slug(first)}.{ascii_slug(last)}.{tag}{i}@paroisse.example"
+      yield (email, hashed, first, last, f"06{rng.randrange(10**8):08d}", roles[i % len(roles)].name, True)
+
+  copy_rows(cursor, "users", ["email", "hashed_password", "first_name", "last_name", "phone", "role", "is_active"], rows())
+  cursor.execute("SELECT id, role FROM users WHERE email LIKE %s", (f"%.{tag}%@paroisse.example",))
+  return cursor.fetchall()
+
+
+def seed_categories(cursor):
+  """Catégories PCG (réutilisées si le code existe déjà)"""
+  for code, (label, *_rest) in CATEGORIES.items():
+    cursor.execute(
+      "INSERT INTO categories (name, code, description, is_active) VALUES (%s, %s, %s, true) ON CONFLICT DO NOTHING",
+      (f"{label} ({code})", code, f"Compte {code} du plan comptable")
+    )
+  # Incrémenter la version du cache des catégories (app/cache.py)
+  cursor.execute(
+    "INSERT INTO cache_versions (name, version) VALUES ('categories', 1) "
+    "ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1, updated_at = now()"
+  )
+  cursor.execute("SELECT code, id FROM categories WHERE code = ANY(%s)", (list(CATEGORIES),))
+  return dict(cursor.fetchall())
+
+
+def seed_contacts(cursor, rng: random.Random, count: int, tag: str, category_codes):
+  """
+  Contacts de tous les types. Environ 40 % de fournisseurs (SIRET valide),
+  chacun rattaché à une catégorie habituelle.
+  """
+  weights = {
+    ContactType.SUPPLIER: 40, ContactType.DONOR: 35, ContactType.VOLUNTEER: 15,
+    ContactType.PRIEST: 3, ContactType.DIOCESE: 1, ContactType.OTHER: 6,
+  }
+  types = rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+  def rows():
+    for i, contact_type in enumerate(types):
+      city, zip_code = rng.choice(CITIES)
+      is_supplier = contact_type == ContactType.SUPPLIER
+      if is_supplier:
+        name = f"{rng.choice(SUPPLIER_KINDS)} {rng.choice(LAST_NAMES)} SARL"
+      elif contact_type == ContactType.DIOCESE:
+        name = f"Économat diocésain de {city}"
+      else:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+      email = f"contact.{tag}{i}@exemple.fr" if rng.random() < 0.8 else None
+      siret = random_siret(rng) if is_supplier and rng.random() < 0.9 else None
+      yield (
+        contact_type.name, is_supplier or contact_type == ContactType.DIOCESE, name, contact_name_key(name), email,
+        city, zip_code, "France", siret, contact_type == ContactType.DONOR, False, rng.random() < 0.95,
+      )
+
+  cursor.execute("SELECT coalesce(max(id), 0) FROM contacts")
+  last_id = cursor.fetchone()[0]
+  columns = ["contact_type", "is_company", "name", "name_key", "email", "city", "zip_code", "country", "siret", "is_donor", "anonymize_donation", "active"]
+  copy_rows(cursor, "contacts", columns, rows())
+
+  cursor.execute("SELECT id FROM contacts WHERE id > %s AND contact_type = 'SUPPLIER'", (last_id,))
+  suppliers = [row[0] for row in cursor.fetchall()]
+  # Fournisseurs habituels : chaque fournisseur sert une catégorie
+  by_category = {code: [] for code in category_codes}
+  codes = list(category_codes)
+  for supplier_id in suppliers:
+    by_category[rng.choice(codes)].append(supplier_id)
+  return by_category
+
+
+def seed_expenses(cursor, rng: random.Random, count: int, years: int, users, category_ids, suppliers_by_code):
+  """Dépenses réparties sur `years` années jusqu'à aujourd'hui"""
+  today = date.today()
+  start = today - timedelta(days=365 * years)
+  span = (today - start).days
+  # Une partition par exercice (sinon les lignes vont dans expenses_default)
+  for year in range(start.year, today.year + 1):
+    cursor.execute("SELECT ensure_expense_partition(%s)", (year,))
+  codes = list(CATEGORIES)
+  category_weights = [CATEGORIES[code][3] for code in codes]
+  # Les trésoriers et prêtres saisissent l'essentiel des dépenses
+  user_weights = [5 if role in ("TREASURER", "PRIEST") else 1 for _, role in users]
+  user_ids = [user_id for user_id, _ in users]
+
+  def pick_date(seasonal: bool) -> date:
+    while True:
+      day = start + timedelta(days=rng.randrange(span))
+      if not seasonal or rng.random() < WINTER_FACTOR[day.month] / 2.2:
+        return day
+
+  def pick_status(day: date) -> str:
+    age = (today - day).days
+    roll = rng.random()
+    if age > 60:
+      status = ExpenseStatus.PAID if roll < 0.88 else ExpenseStatus.CANCELLED if roll < 0.92 else ExpenseStatus.PENDING if roll < 0.98 else ExpenseStatus.DRAFT
+    else:
+      status = ExpenseStatus.PENDING if roll < 0.6 else ExpenseStatus.DRAFT if roll < 0.75 else ExpenseStatus.PAID
+    return status.name
+
+  def rows():
+    category_picks = rng.choices(codes, weights=category_weights, k=count)
+    user_picks = rng.choices(user_ids, weights=user_weights, k=count)
+    for code, user_id in zip(category_picks, user_picks):
+      label, median, sigma, _, seasonal = CATEGORIES[code]
+      day = pick_date(seasonal)
+      amount = round(min(max(rng.lognormvariate(math.log(median), sigma), 1), 99_999_999), 2)
+      suppliers = suppliers_by_code.get(code)
+      contact_id = rng.choice(suppliers) if suppliers and rng.random() < 0.8 else None
+      created = datetime.combine(day + timedelta(days=rng.randrange(5)), dtime(rng.randrange(8, 20), rng.randrange(60)), timezone.utc)
+      yield (
+        f"{amount:.2f}", f"{label} — {MONTHS[day.month - 1]} {day.year}", day.isoformat(), pick_status(day),
+        user_id, category_ids[code], contact_id, created.isoformat(), created.isoformat(),
+      )
+
+  columns = ["amount", "description", "expense_date", "status", "user_id", "category_id", "contact_id", "created_at", "updated_at"]
+  copy_rows(cursor, "expenses", columns, rows())
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--users", type=int, default=25, help="Nombre d'utilisateurs")
+  parser.add_argument("--contacts", type=int, default=20_000, help="Nombre de contacts")
+  parser.add_argument("--expenses", type=int, default=1_000_000, help="Nombre de dépenses")
+  parser.add_argument("--years", type=int, default=5, help="Profondeur d'historique (années)")
+  parser.add_argument("--seed", type=int, default=None, help="Graine aléatoire (jeu reproductible)")
+  parser.add_argument("--truncate", action="store_true", help="Vider users, categories, contacts et expenses avant")
+  args = parser.parse_args()
+
+  rng = random.Random(args.seed)
+  tag = uuid.UUID(int=rng.getrandbits(128)).hex[:6]
+  started = time.perf_counter()
+
+  connection = get_sync_engine().raw_connection()
+  try:
+    # Libellés accentués, quel que soit l'encodage par défaut du serveur
+    connection.driver_connection.set_client_encoding("UTF8")
+    cursor = connection.cursor()
+    if args.truncate:
+      print("Vidage des tables...")
+      cursor.execute("TRUNCATE expenses, contacts, categories, users RESTART IDENTITY CASCADE")
+
+    print("Chargement :")
+    users = seed_users(cursor, rng, args.users, tag)
+    category_ids = seed_categories(cursor)
+    suppliers_by_code = seed_contacts(cursor, rng, args.contacts, tag, category_ids)
+    seed_expenses(cursor, rng, args.expenses, args.years, users, category_ids, suppliers_by_code)
+    connection.commit()
+
+    # Statistiques à jour pour le planificateur (et count=estimated)
+    connection.set_isolation_level(0)
+    cursor.execute("ANALYZE users, categories, contacts, expenses")
+  finally:
+    connection.close()
+
+  print(f"Terminé en {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,125 @@
+"""
+Temps de démarrage d'un worker : import de app.main (détail par paquet et
+par module, via python -X importtime) puis lifespan (connexion à la base,
+partitions), mesurés dans des interpréteurs neufs (démarrage à froid).
+-X importtime ajoute un léger surcoût : comparer des mesures faites
+avec ce script, pas avec un chronométrage sans lui.
+
+--budget-ms fait échouer le script (code 1) si l'import médian de
+app.main dépasse le budget : à lancer en CI pour détecter une régression
+(nouvelle dépendance lourde importée au chargement).
+
+Usage (depuis backend/) :
+  python scripts/startup_report.py --runs 5
+  python scripts/startup_report.py --no-lifespan --budget-ms 900
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Exécuté dans chaque interpréteur mesuré ; résultat en JSON sur stdout
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+result = {"import_ms": (time.perf_counter() - start) * 1000, "psycopg2": "psycopg2" in sys.modules}
+if LIFESPAN:
+  from app.database import async_engine
+  async def startup():
+    async with app.main.app.router.lifespan_context(app.main.app):
+      pass
+    await async_engine.dispose()
+  start = time.perf_counter()
+  asyncio.run(startup())
+  result["lifespan_ms"] = (time.perf_counter() - start) * 1000
+print(json.dumps(result))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float, float]]:
+  """Lignes « import time: self | cumulé | module » -> (module, self ms, cumulé ms)"""
+  modules = []
+  for line in stderr.splitlines():
+    if not line.startswith("import time:") or "self [us]" in line:
+      continue
+    self_us, cumulative_us, name = line[len("import time:"):].split("|")
+    modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+  return modules
+
+
+def run_once(lifespan: bool) -> dict:
+  """Un démarrage à froid : interpréteur neuf, import puis lifespan"""
+  start = time.perf_counter()
+  completed = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", PROBE.replace("LIFESPAN", str(lifespan))],
+    cwd=BACKEND_DIR, capture_output=True, text=True
+  )
+  process_ms = (time.perf_counter() - start) * 1000
+  if completed.returncode != 0:
+    raise SystemExit(completed.stderr[-2000:])
+  result = json.loads(completed.stdout.strip().splitlines()[-1])
+  result["process_ms"] = process_ms
+  result["modules"] = parse_importtime(completed.stderr)
+  return result
+
+
+def median_by_key(runs: List[Dict[str, float]]) -> Dict[str, float]:
+  keys = {key for run in runs for key in run}
+  return {key: statistics.median(run.get(key, 0.0) for run in runs) for key in keys}
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--runs", type=int, default=5, help="Démarrages mesurés (médiane)")
+  parser.add_argument("--top", type=int, default=15, help="Modules les plus lents affichés")
+  parser.add_argument("--no-lifespan", action="store_true", help="Ne pas exécuter le lifespan (sans base)")
+  parser.add_argument("--budget-ms", type=float, default=None, help="Échec si l'import médian de app.main dépasse ce budget")
+  args = parser.parse_args()
+
+  runs = [run_once(not args.no_lifespan) for _ in range(args.runs)]
+
+  # Temps propre (self) cumulé par paquet racine, et par module
+  packages, modules, cumulative = [], [], {}
+  for run in runs:
+    by_package: Dict[str, float] = defaultdict(float)
+    by_module: Dict[str, float] = {}
+    for name, self_ms, cumulative_ms in run["modules"]:
+      by_package[name.split(".")[0]] += self_ms
+      by_module[name] = self_ms
+      cumulative[name] = cumulative_ms
+    packages.append(by_package)
+    modules.append(by_module)
+  packages_median = median_by_key(packages)
+  modules_median = median_by_key(modules)
+
+  import_ms = statistics.median(run["import_ms"] for run in runs)
+  print(f"Démarrage à froid ({args.runs} essais, médianes)")
+  print(f"  processus complet   {statistics.median(run['process_ms'] for run in runs):8.1f} ms")
+  print(f"  import app.main     {import_ms:8.1f} ms")
+  if not args.no_lifespan:
+    print(f"  lifespan            {statistics.median(run['lifespan_ms'] for run in runs):8.1f} ms")
+  print(f"  psycopg2 importé    {'oui' if any(run['psycopg2'] for run in runs) else 'non'}")
+
+  print("\nPar paquet (temps propre des modules) :")
+  for name, self_ms in sorted(packages_median.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+    print(f"  {name:<30} {self_ms:8.1f} ms")
+
+  print("\nModules les plus lents (propre / cumulé) :")
+  for name, self_ms in sorted(modules_median.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+    print(f"  {name:<45} {self_ms:8.1f} / {cumulative[name]:8.1f} ms")
+
+  if args.budget_ms is not None and import_ms > args.budget_ms:
+    print(f"\nÉCHEC : import de app.main en {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
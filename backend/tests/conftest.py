@@ -0,0 +1,19 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+
+from app.database import get_sync_engine
+
+
+@pytest.fixture(scope="session")
+def client():
+  """Client de l'API sur la base configurée (DATABASE_URL), ignoré sans base"""
+  try:
+    with get_sync_engine().connect() as connection:
+      connection.execute(text("SELECT 1"))
+  except (exc.DBAPIError, OSError) as e:
+    pytest.skip(f"Database unavailable: {e}")
+
+  from app.main import app
+  with TestClient(app) as test_client:
+    yield test_client
@@ -0,0 +1,29 @@
+import uuid
+
+
+def test_upsert_matches_email_case_insensitively(client):
+  tag = uuid.uuid4().hex[:8]
+  created = client.post(
+    "/api/contacts/?force=true",
+    json={"contact_type": "donor", "name": f"Casse {tag}", "email": f"casse.{tag}@example.fr"}
+  )
+  assert created.status_code == 201
+
+  report = client.post("/api/contacts/upsert", json={"contacts": [
+    {"contact_type": "donor", "name": f"Casse {tag}", "email": f"Casse.{tag}@Example.fr", "city": "Rennes"}
+  ]}).json()
+  assert (report["created"], report["updated"], report["rejected"]) == (0, 1, 0)
+
+  contacts = client.get("/api/contacts/", params={"search": tag}).json()["items"]
+  assert [contact["id"] for contact in contacts] == [created.json()["id"]]
+  assert contacts[0]["city"] == "Rennes"
+
+
+def test_upsert_rejects_case_duplicates_in_request(client):
+  tag = uuid.uuid4().hex[:8]
+  report = client.post("/api/contacts/upsert", json={"contacts": [
+    {"contact_type": "donor", "name": f"Un {tag}", "email": f"dup.{tag}@example.fr"},
+    {"contact_type": "donor", "name": f"Deux {tag}", "email": f"DUP.{tag}@example.fr"},
+  ]}).json()
+  assert (report["created"], report["rejected"]) == (1, 1)
+  assert report["errors"][0]["index"] == 1
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app import utils
+from app.exceptions import HashingPoolBusyException
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+  """Coût bcrypt minimal : les tests vérifient la logique, pas la lenteur"""
+  monkeypatch.setattr(utils, "BCRYPT_ROUNDS", 4)
+
+
+def hash_with_rounds(monkeypatch, rounds: int) -> str:
+  monkeypatch.setattr(utils, "BCRYPT_ROUNDS", rounds)
+  hashed = utils.hash_password("secret")
+  monkeypatch.setattr(utils, "BCRYPT_ROUNDS", 4)
+  return hashed
+
+
+def test_verify_password_async():
+  hashed = asyncio.run(utils.hash_password_async("secret"))
+  assert asyncio.run(utils.verify_password_async("secret", hashed))
+  assert not asyncio.run(utils.verify_password_async("wrong", hashed))
+
+
+def test_rehash_disabled_by_default(monkeypatch):
+  monkeypatch.setattr(utils, "BCRYPT_REHASH_ON_VERIFY", False)
+  hashed = hash_with_rounds(monkeypatch, 5)
+  assert asyncio.run(utils.verify_and_rehash_password("secret", hashed)) == (True, None)
+
+
+def test_rehash_when_rounds_changed(monkeypatch):
+  monkeypatch.setattr(utils, "BCRYPT_REHASH_ON_VERIFY", True)
+  hashed = hash_with_rounds(monkeypatch, 5)
+  valid, new_hash = asyncio.run(utils.verify_and_rehash_password("secret", hashed))
+  assert valid
+  assert new_hash.split("$")[2] == "04"
+  assert utils.verify_password("secret", new_hash)
+
+
+def test_no_rehash_at_current_rounds(monkeypatch):
+  monkeypatch.setattr(utils, "BCRYPT_REHASH_ON_VERIFY", True)
+  hashed = utils.hash_password("secret")
+  assert asyncio.run(utils.verify_and_rehash_password("secret", hashed)) == (True, None)
+
+
+def test_no_rehash_on_wrong_password(monkeypatch):
+  monkeypatch.setattr(utils, "BCRYPT_REHASH_ON_VERIFY", True)
+  hashed = hash_with_rounds(monkeypatch, 5)
+  assert asyncio.run(utils.verify_and_rehash_password("wrong", hashed)) == (False, None)
+
+
+def test_verify_refused_when_pool_busy(monkeypatch):
+  hashed = utils.hash_password("secret")
+  monkeypatch.setattr(utils, "_hash_pending", utils.HASH_POOL_MAX_PENDING)
+  with pytest.raises(HashingPoolBusyException):
+    asyncio.run(utils.verify_password_async("secret", hashed))
@@ -0,0 +1,21 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import json, sys
+import app.main
+from app import database
+print(json.dumps({"psycopg2": "psycopg2" in sys.modules, "sync_engine": database._sync_engine is not None}))
+"""
+
+
+def test_worker_import_skips_sync_driver():
+  """Importer app.main (démarrage d'un worker) ne charge ni psycopg2 ni le moteur synchrone"""
+  output = subprocess.run(
+    [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+  ).stdout
+  assert json.loads(output.splitlines()[-1]) == {"psycopg2": False, "sync_engine": False}